@@ -0,0 +1,41 @@
+"""
+Measures the memory held per loaded Publication, with tracemalloc, over
+copies of the saved person fixture. Run from the repository root with::
+
+    python -m benchmarks.bench_memory [COPIES]
+
+Only the Publications are kept; the parsed trees are dropped before the
+measurement, so the figure is what a loaded cohort costs to hold.
+"""
+import gc
+import sys
+import tracemalloc
+
+from lxml import etree
+
+import dblp
+from benchmarks import fixtures
+
+def load(content, copies):
+    publications = []
+    for _ in range(copies):
+        root = etree.fromstring(content)
+        publications.extend(dblp.Publication.from_element(r)
+                            for r in root.xpath('/dblpperson/r/*[1]'))
+    return publications
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    content = fixtures.load('person.xml')
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    publications = load(content, copies)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print('{} publications, {:.0f} bytes/record'.format(
+        len(publications), held / float(len(publications))))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares dblp.parsing with the BeautifulSoup/minidom code it replaced in the
+scripts, on the saved fixtures. Run from the repository root with::
+
+    python -m benchmarks.bench_parsing
+
+Needs beautifulsoup4 for the baseline.
+"""
+import timeit
+import warnings
+from collections import Counter
+from xml.dom import minidom
+
+from bs4 import BeautifulSoup
+
+from dblp import parsing
+from benchmarks import fixtures
+
+ESE = 'Empir. Softw. Eng.'
+
+def soup_pid(content, name):
+    xmldoc = minidom.parseString(content)
+    for item in xmldoc.getElementsByTagName('author'):
+        item_name = item.firstChild.nodeValue.strip()
+        if item.hasAttribute('pid') and item_name == name:
+            return item.attributes['pid'].value
+    return None
+
+def soup_coauthors(content):
+    soup = BeautifulSoup(content.decode('utf-8'), 'lxml')
+    return [(a.text, a.get('pid'), int(a.get('count', 0)))
+            for a in soup.find_all('author')]
+
+def soup_ese_counts(content):
+    soup = BeautifulSoup(content.decode('utf-8'), 'lxml')
+    counts = Counter()
+    for article in soup.find_all('r'):
+        if article.find('journal', text=ESE):
+            counts.update({a.get('pid') for a in article.find_all('author')})
+    return counts
+
+def lxml_coauthors(content):
+    return [tuple(a) for a in parsing.iter_authors(content)]
+
+def best_of(func, repeat=5, number=3):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+def main():
+    warnings.simplefilter('ignore')
+    person = fixtures.load('person.xml')
+    coauthors = fixtures.load('coauthors.xml')
+    search = fixtures.load('search.xml')
+    cases = [
+        ('pid lookup', lambda: soup_pid(search, fixtures.OWNER),
+         lambda: parsing.find_pid(search, fixtures.OWNER)),
+        ('coauthor view', lambda: soup_coauthors(coauthors),
+         lambda: lxml_coauthors(coauthors)),
+        ('ESE counts', lambda: soup_ese_counts(person),
+         lambda: parsing.count_journal_authors(person, ESE)),
+    ]
+    print('{:<14} {:>12} {:>12} {:>8}'.format('case', 'baseline ms',
+                                              'lxml ms', 'speedup'))
+    for name, baseline, fast in cases:
+        assert baseline() == fast(), name
+        before, after = best_of(baseline), best_of(fast)
+        print('{:<14} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(
+            name, before * 1000, after * 1000, before / after))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Times dblp.parse_publication against the per-field XPath decoder it replaced,
+over every record of the saved person fixture. Run from the repository root
+with::
+
+    python -m benchmarks.bench_records
+"""
+import timeit
+
+from lxml import etree
+
+import dblp
+from dblp import Citation, Series, first_or_none
+from benchmarks import fixtures
+
+def xpath_publication(publication):
+    return {
+        'type':publication.tag,
+        'sub_type':publication.attrib.get('publtype', None),
+        'mdate':publication.attrib.get('mdate', None),
+        'authors':publication.xpath('author/text()'),
+        'editors':publication.xpath('editor/text()'),
+        'title':first_or_none(publication.xpath('title/text()')),
+        'year':int(first_or_none(publication.xpath('year/text()'))),
+        'month':first_or_none(publication.xpath('month/text()')),
+        'journal':first_or_none(publication.xpath('journal/text()')),
+        'volume':first_or_none(publication.xpath('volume/text()')),
+        'number':first_or_none(publication.xpath('number/text()')),
+        'chapter':first_or_none(publication.xpath('chapter/text()')),
+        'pages':first_or_none(publication.xpath('pages/text()')),
+        'ee':first_or_none(publication.xpath('ee/text()')),
+        'isbn':first_or_none(publication.xpath('isbn/text()')),
+        'url':first_or_none(publication.xpath('url/text()')),
+        'booktitle':first_or_none(publication.xpath('booktitle/text()')),
+        'crossref':first_or_none(publication.xpath('crossref/text()')),
+        'publisher':first_or_none(publication.xpath('publisher/text()')),
+        'school':first_or_none(publication.xpath('school/text()')),
+        'citations':[Citation(c.text, c.attrib.get('label',None))
+                     for c in publication.xpath('cite') if c.text != '...'],
+        'series':first_or_none(Series(s.text, s.attrib.get('href', None))
+                  for s in publication.xpath('series'))
+    }
+
+def main():
+    root = etree.fromstring(fixtures.load('person.xml'))
+    records = root.xpath('/dblpperson/r/*[1]')
+    for record in records:
+        assert xpath_publication(record) == dblp.parse_publication(record)
+
+    def decode(parse):
+        return lambda: [parse(record) for record in records]
+
+    timings = []
+    for parse in (xpath_publication, dblp.parse_publication):
+        timings.append(min(timeit.repeat(decode(parse), repeat=5, number=3))
+                       / 3 / len(records))
+    print('{} records'.format(len(records)))
+    print('per-field xpath: {:.1f} us/record'.format(timings[0] * 1e6))
+    print('single walk:     {:.1f} us/record ({:.1f}x)'.format(
+        timings[1] * 1e6, timings[0] / timings[1]))
+
+if __name__ == '__main__':
+    main()
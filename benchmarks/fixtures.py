@@ -0,0 +1,290 @@
+"""
+A deterministic, synthetic corpus shaped like dblp's XML endpoints.
+
+Running this module (re)writes the saved fixture files in fixtures/:
+
+- person.xml - a prolific author's /pid/<pid>.xml, with <r> records
+- coauthors.xml - the same author's /pid/<pid>.xml?view=coauthor
+- search.xml - a /search/author?xauthor= result with several homonyms
+- record.xml - one of the author's records, as /rec/bibtex/<key>.xml
+- world/ - a small community of authors, each with a person XML, a coauthor
+  view and a search result, for crawling
+- routes.json - which fixture file answers which dblp path
+
+The corpus only depends on the seed, so the files can be regenerated at any
+time and compared byte for byte. FixtureAdapter serves the saved files in
+place of dblp, so the package and the scripts' code paths can be run offline.
+"""
+import json
+import os
+import random
+from urllib.parse import unquote_plus, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+import requests
+from requests.adapters import BaseAdapter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'fixtures')
+
+OWNER = 'Ahmed E. Hassan'
+OWNER_PID = 'h/AhmedEHassan'
+WORLD_SEEDS = 3
+VENUES = [('article', 'journal', 'Empir. Softw. Eng.'),
+          ('article', 'journal', 'IEEE Trans. Software Eng.'),
+          ('inproceedings', 'booktitle', 'ICSE'),
+          ('inproceedings', 'booktitle', 'MSR'),
+          ('inproceedings', 'booktitle', 'ESEC/SIGSOFT FSE')]
+
+def people(n, rnd):
+    """
+    Returns ``n`` distinct (name, pid) pairs.
+    """
+    first = ['Bram', 'Shane', 'Ying', 'Weiyi', 'Emad', 'Foutse', 'Daniel',
+             'Cor-Paul', 'Yasutaka', 'Tse-Hsun', 'Gustavo', 'Meiyappan']
+    last = ['Adams', 'McIntosh', 'Zou', 'Shang', 'Shihab', 'Khomh',
+            'German', 'Bezemer', 'Kamei', 'Chen', 'Oliva', 'Nagappan']
+    result = []
+    for i in range(n):
+        name = '{} {} {:04d}'.format(rnd.choice(first), rnd.choice(last), i)
+        result.append((name, '{}/{}'.format(i % 97, i)))
+    return result
+
+def records(n, coauthors, rnd):
+    """
+    Returns ``n`` record dicts for the owner, newest first.
+    """
+    result = []
+    for i in range(n):
+        tag, venue_tag, venue = rnd.choice(VENUES)
+        year = 2023 - i * 25 // n
+        authors = [(OWNER, OWNER_PID)] + rnd.sample(coauthors,
+                                                    rnd.randint(1, 6))
+        rnd.shuffle(authors)
+        result.append({
+            'tag': tag, 'venue_tag': venue_tag, 'venue': venue, 'year': year,
+            'key': '{}/{}/Paper{}'.format('journals' if tag == 'article'
+                                          else 'conf', venue.split()[0]
+                                          .lower(), i),
+            'title': 'On the empirical study number {} of software.'.format(i),
+            'authors': authors,
+        })
+    return result
+
+def record_xml(record):
+    parts = ['<{} key={} mdate="2023-0{}-15">'.format(
+        record['tag'], quoteattr(record['key']), record['year'] % 9 + 1)]
+    for name, pid in record['authors']:
+        parts.append('<author pid={}>{}</author>'.format(quoteattr(pid),
+                                                          escape(name)))
+    parts.append('<title>{}</title>'.format(escape(record['title'])))
+    parts.append('<pages>1-{}</pages>'.format(len(record['title'])))
+    parts.append('<year>{}</year>'.format(record['year']))
+    parts.append('<{0}>{1}</{0}>'.format(record['venue_tag'],
+                                         escape(record['venue'])))
+    parts.append('<ee>https://doi.org/10.1007/{}</ee>'.format(
+        record['key'].replace('/', '-')))
+    parts.append('<url>db/{}.html</url>'.format(record['key']))
+    parts.append('</{}>'.format(record['tag']))
+    return ''.join(parts)
+
+def person_xml(recs, owner=OWNER, owner_pid=OWNER_PID):
+    counts = {}
+    for record in recs:
+        for author in record['authors']:
+            if author[0] != owner:
+                counts[author] = counts.get(author, 0) + 1
+    lines = ['<?xml version="1.0" encoding="US-ASCII"?>',
+             '<dblpperson name={} pid={} n="{}">'.format(
+                 quoteattr(owner), quoteattr(owner_pid), len(recs)),
+             '<person key="homepages/{0}" mdate="2023-01-01"><author pid="{0}">'
+             '{1}</author><url>https://example.org/~owner</url></person>'
+             .format(owner_pid, escape(owner))]
+    lines.extend('<r>{}</r>'.format(record_xml(r)) for r in recs)
+    lines.append('<coauthors n="{}">'.format(len(counts)))
+    for (name, pid), _ in sorted(counts.items()):
+        lines.append('<co><na pid={}>{}</na></co>'.format(quoteattr(pid),
+                                                          escape(name)))
+    lines.append('</coauthors>')
+    lines.append('</dblpperson>')
+    return '\n'.join(lines) + '\n'
+
+def coauthors_xml(recs, owner=OWNER, owner_pid=OWNER_PID):
+    counts = {}
+    for record in recs:
+        for author in record['authors']:
+            if author[0] != owner:
+                counts[author] = counts.get(author, 0) + 1
+    lines = ['<?xml version="1.0" encoding="US-ASCII"?>',
+             '<coauthors pid={} n="{}">'.format(quoteattr(owner_pid),
+                                                len(counts))]
+    for (name, pid), count in sorted(counts.items()):
+        lines.append('<author pid={} count="{}">{}</author>'.format(
+            quoteattr(pid), count, escape(name)))
+    lines.append('</coauthors>')
+    return '\n'.join(lines) + '\n'
+
+def search_xml(homonyms, owner=OWNER, owner_pid=OWNER_PID):
+    lines = ['<?xml version="1.0" encoding="US-ASCII"?>', '<authors>']
+    for name, pid in homonyms + [(owner, owner_pid)]:
+        lines.append('<author pid={} urlpt={}>{}</author>'.format(
+            quoteattr(pid), quoteattr(pid), escape(name)))
+    lines.append('</authors>')
+    return '\n'.join(lines) + '\n'
+
+def record_file_xml(record):
+    return '\n'.join(['<?xml version="1.0" encoding="US-ASCII"?>', '<dblp>',
+                      record_xml(record), '</dblp>']) + '\n'
+
+def world_records(members, n, rnd):
+    """
+    Returns ``n`` records among ``members``, with a few prolific authors
+    on most of them, the way a research community looks.
+    """
+    weights = [1.0 / (i + 1) for i in range(len(members))]
+    result = []
+    for i in range(n):
+        authors = []
+        while len(authors) < rnd.randint(2, 5):
+            author = rnd.choices(members, weights)[0]
+            if author not in authors:
+                authors.append(author)
+        tag, venue_tag, venue = rnd.choice(VENUES)
+        result.append({
+            'tag': tag, 'venue_tag': venue_tag, 'venue': venue,
+            'year': 2023 - i * 15 // n,
+            'key': 'world/{}'.format(i),
+            'title': 'A community study number {}.'.format(i),
+            'authors': authors,
+        })
+    return result
+
+def _file_name(pid):
+    return pid.replace('/', '-')
+
+def world(n_members=30, n_records=240, seed=2024):
+    """
+    Returns (seeds, files, routes) for a small crawlable community: the
+    seeds' names, {file name: contents} and {dblp path: file name}.
+    """
+    rnd = random.Random(seed)
+    members = [('{} {}'.format(name.rsplit(' ', 1)[0], i), 'w/{}'.format(i))
+               for i, (name, _) in enumerate(people(n_members, rnd))]
+    recs = world_records(members, n_records, rnd)
+    files, routes = {}, {}
+    for name, pid in members:
+        own = [r for r in recs if (name, pid) in r['authors']]
+        base = 'world/' + _file_name(pid)
+        files[base + '.xml'] = person_xml(own, name, pid)
+        files[base + '.coauthors.xml'] = coauthors_xml(own, name, pid)
+        files[base + '.search.xml'] = search_xml([], name, pid)
+        routes['/pid/{}.xml'.format(pid)] = base + '.xml'
+        routes['/pid/{}.xml?view=coauthor'.format(pid)] = \
+            base + '.coauthors.xml'
+        routes['/search/author?xauthor={}'.format(name)] = base + '.search.xml'
+    return [name for name, _ in members[:WORLD_SEEDS]], files, routes
+
+def corpus(n_records=800, n_coauthors=400, seed=2023):
+    """
+    Returns a dict from fixture file name to its contents (bytes).
+    """
+    rnd = random.Random(seed)
+    coauthors = people(n_coauthors, rnd)
+    recs = records(n_records, coauthors, rnd)
+    homonyms = [('{} {:04d}'.format(OWNER, i), 'h/{}'.format(i))
+                for i in range(1, 30)]
+    files = {
+        'person.xml': person_xml(recs),
+        'coauthors.xml': coauthors_xml(recs),
+        'search.xml': search_xml(homonyms),
+        'record.xml': record_file_xml(recs[0]),
+    }
+    routes = {
+        '/pid/{}.xml'.format(OWNER_PID): 'person.xml',
+        '/pid/{}.xml?view=coauthor'.format(OWNER_PID): 'coauthors.xml',
+        '/search/author?xauthor={}'.format(OWNER): 'search.xml',
+        '/rec/bibtex/{}.xml'.format(recs[0]['key']): 'record.xml',
+    }
+    seeds, world_files, world_routes = world()
+    files.update(world_files)
+    routes.update(world_routes)
+    files['routes.json'] = json.dumps({'record_key': recs[0]['key'],
+                                       'world_seeds': seeds,
+                                       'routes': routes},
+                                      indent=1, sort_keys=True) + '\n'
+    return dict((name, content.encode('ascii', 'xmlcharrefreplace'))
+                for name, content in files.items())
+
+def load(name):
+    """
+    Returns the saved fixture file ``name`` as bytes.
+    """
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+def load_routes():
+    """
+    Returns the saved routes.json: the record fixture's key, the world's
+    seed names and the {dblp path: file name} routes.
+    """
+    return json.loads(load('routes.json').decode('ascii'))
+
+class FixtureAdapter(BaseAdapter):
+    """
+    A requests transport adapter that answers dblp requests from the saved
+    fixtures: 200 with the file routed to the URL's path and query, whatever
+    the host, and 404 for anything else. Mount it with install().
+
+    Attributes:
+    requests - how many requests it has answered
+    """
+    def __init__(self, routes=None):
+        super(FixtureAdapter, self).__init__()
+        self.routes = routes if routes is not None else load_routes()['routes']
+        self.requests = 0
+        self._files = {}
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        parts = urlsplit(request.url)
+        path = unquote_plus(parts.path + ('?' + parts.query if parts.query
+                                          else ''))
+        name = self.routes.get(path)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        if name is None:
+            response.status_code = 404
+            response._content = b'not found'
+        else:
+            if name not in self._files:
+                self._files[name] = load(name)
+            response.status_code = 200
+            response._content = self._files[name]
+            response.headers['Content-Type'] = 'application/xml'
+        return response
+
+    def close(self):
+        pass
+
+def install(client):
+    """
+    Routes every request of ``client`` (a dblp.client.Client) to a new
+    FixtureAdapter, and returns the adapter.
+    """
+    adapter = FixtureAdapter()
+    client.session.mount('http://', adapter)
+    client.session.mount('https://', adapter)
+    return adapter
+
+def write(directory=FIXTURES_DIR):
+    for name, content in sorted(corpus().items()):
+        path = os.path.join(directory, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(content)
+        print('wrote {} ({} bytes)'.format(name, len(content)))
+
+if __name__ == '__main__':
+    write()
@@ -0,0 +1,211 @@
+"""
+Times and measures the memory of the package's main code paths on the saved
+fixtures, and compares the results between commits. Run from the
+repository root with::
+
+    python -m benchmarks.suite                 # run, save results/<commit>.json
+    python -m benchmarks.suite --compare OLD   # run, compare with OLD
+    python -m benchmarks.suite --compare OLD NEW
+
+OLD and NEW are commits with saved results (or paths to results files). Each
+benchmark goes through the real client with a FixtureAdapter in place of the
+network, so request handling is included but dblp's latency isn't. The ESE
+benchmarks call ese.py's own functions, so the script is measured as it
+runs. Times are the best of several runs; memory is the tracemalloc peak of
+one call. A comparison exits with status 1 if anything got slower or bigger
+by more than the threshold; timings on a busy or single-core machine move by
+up to 20% between identical runs, hence the default of 25%.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import dblp
+import ese
+from dblp import client
+from dblp.resolver import PidResolver
+from benchmarks import fixtures
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+DEFAULT_THRESHOLD = 0.25
+MIN_RUN_TIME = 0.2
+
+def sunburst(seeds):
+    """
+    ese.py's whole sunburst build: resolves ``seeds``, crawls two levels of
+    ESE coauthors and writes the tree, which is returned as a string.
+    """
+    seed_names = ese.resolve_seeds(PidResolver(), seeds)
+    out = io.StringIO()
+    ese.save_sunburst(out, seed_names, ese.get_ese_coauthors)
+    return out.getvalue()
+
+def benchmarks():
+    """
+    Returns the (name, function) benchmarks.
+    """
+    routes = fixtures.load_routes()
+    return [
+        ('author_load', lambda: dblp.Author(
+            None, pid=fixtures.OWNER_PID).load_data()),
+        ('publication_load', lambda: dblp.Publication(
+            routes['record_key']).load_data()),
+        ('search', lambda: dblp.search(fixtures.OWNER)),
+        ('ese_counting', lambda: ese.get_ese_coauthors(fixtures.OWNER_PID)),
+        ('sunburst_build', lambda: sunburst(routes['world_seeds'])),
+    ]
+
+def best_time(func, repeat, min_time=MIN_RUN_TIME):
+    """
+    Returns the seconds per call of ``func``, the best of ``repeat`` runs of
+    as many calls as take ``min_time``.
+    """
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, int(min_time / max(once, 1e-9)))
+    best = None
+    # like timeit, keep the collector from landing in some runs and not others
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = (time.perf_counter() - start) / number
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _git(*args):
+    try:
+        return subprocess.check_output(
+            ('git',) + args, stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(BENCHMARKS_DIR)).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def current_commit():
+    """
+    Returns the short hash of HEAD, suffixed with "-dirty" when files
+    outside benchmarks/ have uncommitted changes, or "unknown".
+    """
+    commit = _git('rev-parse', '--short', 'HEAD')
+    if commit is None:
+        return 'unknown'
+    if _git('status', '--porcelain', '--untracked-files=no', '--', '.',
+            ':!benchmarks'):
+        commit += '-dirty'
+    return commit
+
+def run(repeat=5):
+    """
+    Runs every benchmark and returns the results dict.
+    """
+    client.configure()
+    fixtures.install(client.get_client())
+    results = {}
+    for name, func in benchmarks():
+        func()  # warm up imports, fixture files and connection state
+        results[name] = {'seconds': best_time(func, repeat),
+                         'peak_bytes': peak_memory(func)}
+    return {'commit': current_commit(), 'python': platform.python_version(),
+            'platform': platform.platform(), 'benchmarks': results}
+
+def save(results, directory=RESULTS_DIR):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    path = os.path.join(directory, '{}.json'.format(results['commit']))
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return path
+
+def load(name, directory=RESULTS_DIR):
+    """
+    Loads saved results, by commit or by path.
+    """
+    path = name if os.path.exists(name) else \
+        os.path.join(directory, '{}.json'.format(name))
+    with open(path) as f:
+        return json.load(f)
+
+def report(results):
+    print('{:<18} {:>12} {:>14}'.format('benchmark', 'time', 'peak memory'))
+    for name, result in sorted(results['benchmarks'].items()):
+        print('{:<18} {:>10.3f}ms {:>12.0f}KB'.format(
+            name, result['seconds'] * 1000, result['peak_bytes'] / 1024.0))
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """
+    Prints how each benchmark changed from ``old`` to ``new`` results and
+    returns the names that got worse by more than ``threshold``.
+    """
+    print('{} -> {}'.format(old['commit'], new['commit']))
+    print('{:<18} {:>10} {:>10}'.format('benchmark', 'time', 'memory'))
+    worse = []
+    for name in sorted(new['benchmarks']):
+        if name not in old['benchmarks']:
+            print('{:<18} {:>10} {:>10}'.format(name, 'new', 'new'))
+            continue
+        changes = []
+        flags = []
+        for field, label in (('seconds', 'slower'), ('peak_bytes', 'bigger')):
+            change = new['benchmarks'][name][field] / \
+                float(old['benchmarks'][name][field]) - 1
+            changes.append('{:+.1%}'.format(change))
+            if change > threshold:
+                flags.append(label)
+        if flags:
+            worse.append(name)
+        print('{:<18} {:>10} {:>10}  {}'.format(name, changes[0], changes[1],
+                                               ' '.join(flags)))
+    return worse
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    parser.add_argument('--compare', nargs='+', metavar='RESULTS',
+                        help='saved results to compare: OLD, or OLD NEW')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timing runs per benchmark (default 5)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change reported as a regression')
+    parser.add_argument('--no-save', action='store_true',
+                        help="don't save this run's results")
+    args = parser.parse_args()
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare takes one or two results')
+
+    if args.compare and len(args.compare) == 2:
+        new = load(args.compare[1])
+    else:
+        new = run(args.repeat)
+        report(new)
+        if not args.no_save:
+            print('saved {}'.format(save(new)))
+    if args.compare:
+        if compare(load(args.compare[0]), new, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,36 +1,26 @@
-from xml.dom import minidom
-import requests
-from bs4 import BeautifulSoup
+from dblp import client, parsing
+from dblp.cache import ResponseCache
+from dblp.resolver import PidResolver
+
+client.configure(cache=ResponseCache("dblp_cache.sqlite"))
+
+# Name -> PID mappings are kept between runs, so known authors resolve at once
+resolver = PidResolver("dblp_pids.sqlite")
 
 # Function to preprocess author names
 def preprocess_author_name(author_name):
     return author_name.replace(" ", "_")
 
-# Get Author's pid
-def get_urlpt(name):
-    url = 'http://dblp.uni-trier.de/search/author?xauthor='+name
-    response = requests.get(url)
-    
-    xmldoc = minidom.parseString(response.content)
-    item = xmldoc.getElementsByTagName('author')[0]
-    
-    if item.hasAttribute("pid"):
-        return item.attributes['pid'].value
-    
-    return None
-
 # Function to retrieve coauthors from DBLP in XML format
-def get_coauthors_from_dblp(author_name):
-    url = f"https://dblp.uni-trier.de/pid/{author_name}.xml?view=coauthor"
+def get_coauthors_from_dblp(pid):
+    url = f"https://dblp.uni-trier.de/pid/{pid}.xml?view=coauthor"
     
-    response = requests.get(url)
+    response = client.get(url)
     if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "lxml")
         coauthors = {}
-        author_elements = soup.find_all("author")
-        for author_element in author_elements:
-            coauthor_name = preprocess_author_name(author_element.text)
-            coauthor_count = int(author_element["count"])
+        for author in parsing.iter_authors(response.content):
+            coauthor_name = preprocess_author_name(author.name)
+            coauthor_count = author.count
             coauthors[coauthor_name] = {
                 "name": coauthor_name,
                 "count": coauthor_count,
@@ -59,14 +49,23 @@ authors = [
     'James Miller 0001', 'Andrea Arcuri', 'Raula Gaikovina Kula'
 ]
 
+# Resolve every author's PID in one batch; unknown names are searched for
+# concurrently
+pids = resolver.resolve_all(authors)
+
 # Process and retrieve data for each author and their top collaborators
 data = {}
-for author_name in authors:
+for author_name, pid in zip(authors, pids):
     data[author_name] = {"name": author_name, "children": []}
-    coauthors = get_coauthors_from_dblp(preprocess_author_name(author_name))
+    coauthors = get_coauthors_from_dblp(pid) if pid else None
     if coauthors:
         data[author_name]["children"] = list(coauthors.values())
 
 # Print the data (You can save it to a JSON file if needed)
 import json
 print(json.dumps(data, indent=2))
+
+stats = client.get_client().stats
+print(f"Connections opened: {stats.opened}, reused: {stats.reused}")
+print(f"Cache: {client.get_client().cache.stats}")
+print(f"PID resolver: {resolver.stats}")
@@ -3,6 +3,7 @@ import dblp
 authors = dblp.search('Jimmy Lin')
 
 jimmy = authors[0]
+jimmy.prefetch_publications()
 
 # print (len(jimmy.publications))
 print(jimmy.publications[0].title)
@@ -1,129 +1,39 @@
-import json
-import re
-from xml.dom import minidom
-import requests
-from bs4 import BeautifulSoup
-
-
-# Function to preprocess author name
-def preprocess_author_name(name):
-    # Add any preprocessing steps if needed
-    return name
-
-
-# Function to get author's pid
-def get_pid(name):
-    # Remove numbers and parentheses from the author name
-    author_name = re.sub(r"\(\d+\)", "", name).strip()
-    url = "https://dblp.uni-trier.de/search/author?xauthor=" + author_name
-    response = requests.get(url)
-
-    xmldoc = minidom.parseString(response.content)
-    author_elements = xmldoc.getElementsByTagName("author")
-
-    for item in author_elements:
-        item_name = item.firstChild.nodeValue.strip()
-        if item.hasAttribute("pid") and item_name == author_name:
-            return item.attributes["pid"].value
-
-    return None
-
-
-# Function to retrieve top 5 coauthors within ESE for an author using their PID
-def get_top_coauthors(pid):
-    url = f"https://dblp.uni-trier.de/pid/{pid}.xml?view=coauthor"
-
-    response = requests.get(url)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "lxml")
-        coauthors = []
-        author_elements = soup.find_all("author")
-
-        for author_element in author_elements:
-            coauthor_name = preprocess_author_name(author_element.text)
-            coauthor_pid = author_element.get("pid")
-            coauthors.append({"name": coauthor_name, "pid": coauthor_pid, "count": 0})
-
-        # Fetch ESE publications for the main author
-        author_url = f"https://dblp.uni-trier.de/pid/{pid}.xml"
-        author_response = requests.get(author_url)
-        if author_response.status_code == 200:
-            author_soup = BeautifulSoup(author_response.text, "lxml")
-            articles = author_soup.find_all("r")
-
-            for article in articles:
-                article_authors = article.find_all("author")
-                ese_publication = article.find("journal", text="Empir. Softw. Eng.")
-                if ese_publication:
-                    for coauthor in coauthors:
-                        if any(
-                            coauthor["pid"] in author.get("pid")
-                            for author in article_authors
-                        ):
-                            coauthor["count"] += 1
-
-        # Sort coauthors by count in descending order
-        coauthors.sort(key=lambda x: x["count"], reverse=True)
-
-        # Get the top 5 coauthors
-        top_5_coauthors = coauthors[:5]
-
-        # For each coauthor, fetch their top 5 collaborators within ESE
-        for coauthor in top_5_coauthors:
-            coauthor["collaborators"] = get_ese_coauthors(coauthor["pid"])
-
-        return top_5_coauthors
-
-    return None
-
-
-# Function to retrieve top 5 collaborators for a coauthor within ESE
-def get_ese_coauthors(coauthor_pid):
-    url = f"https://dblp.uni-trier.de/pid/{coauthor_pid}.xml?view=coauthor"
-
-    response = requests.get(url)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "lxml")
-        collaborators = []
-        author_elements = soup.find_all("author")
-
-        for author_element in author_elements:
-            collaborator_name = preprocess_author_name(author_element.text)
-            collaborator_pid = author_element.get("pid")
-            collaborators.append(
-                {
-                    "name": collaborator_name,
-                    "pid": collaborator_pid,
-                    "count": 0,
-                    "value": 100,
-                }
-            )
-
-        # Fetch ESE publications for the coauthor
-        coauthor_url = f"https://dblp.uni-trier.de/pid/{coauthor_pid}.xml"
-        coauthor_response = requests.get(coauthor_url)
-        if coauthor_response.status_code == 200:
-            coauthor_soup = BeautifulSoup(coauthor_response.text, "lxml")
-            articles = coauthor_soup.find_all("r")
-
-            for article in articles:
-                article_authors = article.find_all("author")
-                ese_publication = article.find("journal", text="Empir. Softw. Eng.")
-                if ese_publication:
-                    for collaborator in collaborators:
-                        if any(
-                            collaborator["pid"] in author.get("pid")
-                            for author in article_authors
-                        ):
-                            collaborator["count"] += 1
-
-        # Sort collaborators by count in descending order
-        collaborators.sort(key=lambda x: x["count"], reverse=True)
-
-        # Get the top 5 collaborators
-        return collaborators[:5]
+from ese import (
+    configure,
+    get_ese_coauthors,
+    make_recrawler,
+    print_stats,
+    resolve_seeds,
+    save_sunburst,
+)
+
+
+# Function to convert one author's part of the crawl into the sunburst format:
+# author -> top 5 ESE coauthors -> each coauthor's top 5 ESE coauthors
+def convert_to_sunburst_data(crawl_result, seed_names, seed):
+    def make_node(entry, depth):
+        pid = entry["pid"]
+        if depth == 0:
+            top_coauthors = crawl_result.children(pid)
+            return {
+                "name": seed_names[pid],
+                "most_collaborated": top_coauthors[0]["name"] if top_coauthors else "",
+                "url": f"https://dblp.uni-trier.de/pid/{pid}.html",
+            }
+        if depth == 1:
+            return {
+                "name": f"{entry['name']} ({entry['count']})",
+                "url": f"https://dblp.uni-trier.de/pid/{pid}.html",
+                "value": 100,
+            }
+        return {
+            "name": entry["name"],
+            "pid": pid,
+            "count": entry["count"],
+            "value": 100,
+        }
 
-    return None
+    return crawl_result.tree(seed, make_node, max_depth=2)
 
 
 # Example usage:
@@ -140,46 +50,24 @@ authors = [
     "Cor-Paul Bezemer (20)",
 ]
 
-authors_data = {}
-
-for author in authors:
-    pid = get_pid(author)
-    if pid:
-        top_coauthors = get_top_coauthors(pid)
-        authors_data[author] = {
-            "name": author,
-            "pid": pid,
-            "most_collaborated": top_coauthors[0]["name"] if top_coauthors else "",
-            "top_coauthors": top_coauthors,
-        }
-
-# Convert data to a format suitable for visualization
-sunburst_data = {
-    "name": "ESE Authors",
-    "children": [],
-}
 
-for author_name, author_info in authors_data.items():
-    author_node = {
-        "name": author_info["name"],
-        "most_collaborated": author_info["most_collaborated"],
-        "url": f"https://dblp.uni-trier.de/pid/{author_info['pid']}.html",
-        "children": [],
-    }
+def main():
+    resolver = configure()
+    seed_names = resolve_seeds(resolver, authors)
+    # Same expand function as ese.py, so the two share their stored crawls
+    recrawler = make_recrawler("ese.get_ese_coauthors", get_ese_coauthors)
 
-    for coauthor in author_info["top_coauthors"]:
-        coauthor_node = {
-            "name": f"{coauthor['name']} ({coauthor['count']})",
-            "url": f"https://dblp.uni-trier.de/pid/{coauthor['pid']}.html",
-            "value": 100,
-            "children": get_ese_coauthors(coauthor["pid"]),
-        }
-        author_node["children"].append(coauthor_node)
+    save_sunburst(
+        "final_ese_coauthors.json",
+        seed_names,
+        recrawler.expand,
+        root="ESE Authors",
+        convert=convert_to_sunburst_data,
+    )
 
-    sunburst_data["children"].append(author_node)
+    print("File saved to final_ese_coauthors.json")
+    print_stats(resolver, recrawler)
 
-# Save the final JSON
-with open("final_ese_coauthors.json", "w") as f:
-    json.dump(sunburst_data, f, indent=2)
 
-print("File saved to final_ese_coauthors.json")
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,72 @@
-import requests
+import io
 from lxml import etree
 from collections import namedtuple
+from sys import intern
+from concurrent.futures import ThreadPoolExecutor
+
+from dblp import aio, client, parsing
 
 DBLP_BASE_URL = 'http://dblp.uni-trier.de/'
 DBLP_AUTHOR_SEARCH_URL = DBLP_BASE_URL + 'search/author'
 
 DBLP_PERSON_URL = DBLP_BASE_URL + 'pers/xk/{urlpt}'
 DBLP_PUBLICATION_URL = DBLP_BASE_URL + 'rec/bibtex/{key}.xml'
+DBLP_PID_URL = DBLP_BASE_URL + 'pid/{pid}.xml'
+DBLP_AUTHOR_API_URL = DBLP_BASE_URL + 'search/author/api'
+
+# dblp's search APIs serve at most this many hits per page and per query
+API_MAX_PAGE_SIZE = 1000
+API_MAX_HITS = 10000
+
+DEFAULT_MAX_WORKERS = 8
 
 class LazyAPIData(object):
-    def __init__(self, lazy_attrs):
-        self.lazy_attrs = set(lazy_attrs)
-        self.data = None
+    """
+    Base of the lazily loaded records. A record's values live in one tuple
+    ordered like the class-level ``fields``, loaded on first access to any
+    field. Records have slots rather than a __dict__, so fields can't be
+    assigned one by one; ``data`` reads and replaces the whole record as a
+    dict, and is None until loaded.
 
-    def __getattr__(self, key):
-        if key in self.lazy_attrs:
-            if self.data is None:
-                self.load_data()
-            return self.data[key]
-        raise AttributeError(key)
+    The raw XML a record was loaded from is only kept in ``xml`` when
+    ``keep_xml`` is set, eg ``dblp.Publication.keep_xml = True``.
+    """
+    __slots__ = ('_values',)
+    fields = ()
+    _index = {}
+    keep_xml = False
+
+    def __init__(self):
+        self._values = None
 
+    @property
+    def data(self):
+        if self._values is None:
+            return None
+        return dict(zip(self.fields, self._values))
+
+    @data.setter
+    def data(self, data):
+        self._values = None if data is None else \
+            tuple(data.get(f) for f in self.fields)
+
+    def __getattr__(self, key):
+        index = self._index.get(key)
+        if index is None:
+            raise AttributeError(key)
+        if self._values is None:
+            self.load_data()
+        return self._values[index]
 
     def load_data(self):
         pass
 
+    def aload(self):
+        """
+        Awaitable version of load_data; returns this object once loaded.
+        """
+        return aio.load(self)
+
 class Author(LazyAPIData):
     """
     Represents a DBLP author. All data but the author's key is lazily loaded.
@@ -35,28 +78,42 @@ class Author(LazyAPIData):
     homepages - a list of author homepage URLs
     homonyms - a list of author aliases
     """
-    def __init__(self, urlpt):
+    __slots__ = ('urlpt', 'pid', 'xml')
+    fields = ('name', 'publications', 'homepages', 'homonyms')
+    _index = dict(zip(fields, range(len(fields))))
+
+    def __init__(self, urlpt, pid=None):
         self.urlpt = urlpt
+        self.pid = pid
         self.xml = None
-        super(Author, self).__init__(['name','publications','homepages',
-                                      'homonyms'])
+        super(Author, self).__init__()
 
     def load_data(self):
-        resp = requests.get(DBLP_PERSON_URL.format(urlpt=self.urlpt))
-        # TODO error handling
-        xml = resp.content
-        self.xml = xml
-        root = etree.fromstring(xml)
-        data = {
-            'name':root.attrib['name'],
-            'publications':[Publication(k) for k in 
-                            root.xpath('/dblpperson/dblpkey[not(@type)]/text()')],
-            'homepages':root.xpath(
-                '/dblpperson/dblpkey[@type="person record"]/text()'),
-            'homonyms':root.xpath('/dblpperson/homonym/text()')
-        }
+        self.data = get_backend().load_author(self)
+
+    def iter_publications(self):
+        """
+        Yields this author's publications one at a time, without building the
+        whole list first, so a caller can stop early. Once the author is
+        loaded, its publications list is iterated instead.
+        """
+        backend = get_backend()
+        if self._values is None and hasattr(backend, 'iter_publications'):
+            return backend.iter_publications(self)
+        return iter(self.publications)
+
+    def aprefetch_publications(self):
+        """
+        Awaitable version of prefetch_publications.
+        """
+        return aio.prefetch_publications(self)
 
-        self.data = data
+    def prefetch_publications(self, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Loads every publication of this author in one concurrent batch and
+        returns them.
+        """
+        return load_many(self.publications, max_workers=max_workers)
 
 def first_or_none(seq):
     try:
@@ -95,54 +152,261 @@ class Publication(LazyAPIData):
     series - a (text, href) named tuple describing the containing series, if
     applicable
     """
+    __slots__ = ('key', 'xml')
+    fields = ('type', 'sub_type', 'mdate', 'authors', 'editors', 'title',
+              'year', 'month', 'journal', 'volume', 'number', 'chapter',
+              'pages', 'ee', 'isbn', 'url', 'booktitle', 'crossref',
+              'publisher', 'school', 'citations', 'series')
+    _index = dict(zip(fields, range(len(fields))))
+
     def __init__(self, key):
         self.key = key
         self.xml = None
-        super(Publication, self).__init__( ['type', 'sub_type', 'mdate',
-                'authors', 'editors', 'title', 'year', 'month', 'journal',
-                'volume', 'number', 'chapter', 'pages', 'ee', 'isbn', 'url',
-                'booktitle', 'crossref', 'publisher', 'school', 'citations',
-                'series'])
+        super(Publication, self).__init__()
+
+    @classmethod
+    def from_element(cls, element):
+        """
+        Builds an already-loaded Publication from a record element, eg one of
+        the <r> children of a person's XML.
+        """
+        publication = cls(element.attrib.get('key'))
+        publication.data = parse_publication(element)
+        return publication
 
     def load_data(self):
-        resp = requests.get(DBLP_PUBLICATION_URL.format(key=self.key))
+        self.data = get_backend().load_publication(self)
+
+# record children holding a single text value, decoded to the field of the
+# same name; every other field is built by parse_publication itself
+_TEXT_FIELDS = frozenset(['title', 'year', 'month', 'journal', 'volume',
+                          'number', 'chapter', 'pages', 'ee', 'isbn', 'url',
+                          'booktitle', 'crossref', 'publisher', 'school'])
+# values repeated across many records; interning them shares one string
+_SHARED_FIELDS = frozenset(['journal', 'booktitle', 'publisher', 'school'])
+
+def _text_nodes(element):
+    """
+    Yields the text nodes directly under ``element``, like XPath text().
+    """
+    if element.text is not None:
+        yield element.text
+    for child in element:
+        if child.tail is not None:
+            yield child.tail
+
+def parse_publication(publication):
+    """
+    Returns the data dict of a Publication from its record element, in one
+    walk over the element's children.
+    """
+    sub_type = publication.attrib.get('publtype', None)
+    mdate = publication.attrib.get('mdate', None)
+    data = {
+        'type':intern(publication.tag),
+        'sub_type':intern(sub_type) if sub_type is not None else None,
+        'mdate':intern(mdate) if mdate is not None else None,
+        'authors':[],
+        'editors':[],
+        'title':None,
+        'year':None,
+        'month':None,
+        'journal':None,
+        'volume':None,
+        'number':None,
+        'chapter':None,
+        'pages':None,
+        'ee':None,
+        'isbn':None,
+        'url':None,
+        'booktitle':None,
+        'crossref':None,
+        'publisher':None,
+        'school':None,
+        'citations':[],
+        'series':None
+    }
+
+    for child in publication:
+        tag = child.tag
+        if tag in _TEXT_FIELDS:
+            if data[tag] is None:
+                value = first_or_none(_text_nodes(child))
+                if value is not None and tag in _SHARED_FIELDS:
+                    value = intern(value)
+                data[tag] = value
+        elif tag == 'author' or tag == 'editor':
+            data[tag + 's'].extend(intern(t) for t in _text_nodes(child))
+        elif tag == 'cite':
+            if child.text != '...':
+                data['citations'].append(Citation(child.text,
+                                                  child.attrib.get('label',
+                                                                   None)))
+        elif tag == 'series':
+            if data['series'] is None:
+                data['series'] = Series(child.text,
+                                        child.attrib.get('href', None))
+    if data['year'] is not None:
+        data['year'] = int(data['year'])
+
+    return data
+
+class RemoteBackend(object):
+    """
+    Loads data from the live dblp web API. This is the default backend.
+    """
+    def _fetch_author(self, author):
+        if author.pid is not None:
+            resp = client.get(DBLP_PID_URL.format(pid=author.pid))
+        else:
+            resp = client.get(DBLP_PERSON_URL.format(urlpt=author.urlpt))
+        resp.raise_for_status()
         xml = resp.content
-        self.xml = xml
+        if author.keep_xml:
+            author.xml = xml
+        return xml
+
+    def load_author(self, author):
+        root = etree.fromstring(self._fetch_author(author))
+        records = root.xpath('/dblpperson/r/*[1]')
+        if records:
+            # full person records already carry every publication, so build
+            # them pre-loaded rather than fetching each key separately
+            publications = [Publication.from_element(r) for r in records]
+        else:
+            publications = [Publication(k) for k in
+                            root.xpath('/dblpperson/dblpkey[not(@type)]/text()')]
+        return {
+            'name':root.attrib['name'],
+            'publications':publications,
+            'homepages':root.xpath(
+                '/dblpperson/dblpkey[@type="person record"]/text()') +
+                root.xpath('/dblpperson/person/url/text()'),
+            'homonyms':root.xpath('/dblpperson/homonym/text()')
+        }
+
+    def iter_publications(self, author):
+        xml = self._fetch_author(author)
+        found = False
+        for record in parsing.iter_records(xml):
+            found = True
+            yield Publication.from_element(record)
+        if not found:
+            # only keys are listed; each publication loads on access
+            root = etree.fromstring(xml)
+            for key in root.xpath('/dblpperson/dblpkey[not(@type)]/text()'):
+                yield Publication(str(key))
+
+    def load_publication(self, publication):
+        resp = client.get(DBLP_PUBLICATION_URL.format(key=publication.key))
+        resp.raise_for_status()
+        xml = resp.content
+        if publication.keep_xml:
+            publication.xml = xml
         root = etree.fromstring(xml)
-        publication = first_or_none(root.xpath('/dblp/*[1]'))
-        if publication is None:
+        element = first_or_none(root.xpath('/dblp/*[1]'))
+        if element is None:
             raise ValueError
-        data = {
-            'type':publication.tag,
-            'sub_type':publication.attrib.get('publtype', None),
-            'mdate':publication.attrib.get('mdate', None),
-            'authors':publication.xpath('author/text()'),
-            'editors':publication.xpath('editor/text()'),
-            'title':first_or_none(publication.xpath('title/text()')),
-            'year':int(first_or_none(publication.xpath('year/text()'))),
-            'month':first_or_none(publication.xpath('month/text()')),
-            'journal':first_or_none(publication.xpath('journal/text()')),
-            'volume':first_or_none(publication.xpath('volume/text()')),
-            'number':first_or_none(publication.xpath('number/text()')),
-            'chapter':first_or_none(publication.xpath('chapter/text()')),
-            'pages':first_or_none(publication.xpath('pages/text()')),
-            'ee':first_or_none(publication.xpath('ee/text()')),
-            'isbn':first_or_none(publication.xpath('isbn/text()')),
-            'url':first_or_none(publication.xpath('url/text()')),
-            'booktitle':first_or_none(publication.xpath('booktitle/text()')),
-            'crossref':first_or_none(publication.xpath('crossref/text()')),
-            'publisher':first_or_none(publication.xpath('publisher/text()')),
-            'school':first_or_none(publication.xpath('school/text()')),
-            'citations':[Citation(c.text, c.attrib.get('label',None))
-                         for c in publication.xpath('cite') if c.text != '...'],
-            'series':first_or_none(Series(s.text, s.attrib.get('href', None))
-                      for s in publication.xpath('series'))
-        }
+        return parse_publication(element)
+
+    def search(self, author_str):
+        return list(self.iter_search(author_str))
+
+    def iter_search(self, author_str, page_size=None):
+        if page_size is not None:
+            for info in iter_api_hits(DBLP_AUTHOR_API_URL, author_str,
+                                      page_size):
+                url = info.findtext('url') or ''
+                if '/pid/' in url:
+                    yield Author(None, pid=url.split('/pid/', 1)[1])
+            return
+        resp = client.get(DBLP_AUTHOR_SEARCH_URL, params={'xauthor':author_str})
+        resp.raise_for_status()
+        for _, a in etree.iterparse(io.BytesIO(resp.content), tag='author'):
+            if 'urlpt' in a.attrib:
+                yield Author(a.attrib['urlpt'], pid=a.attrib.get('pid'))
+            a.clear()
+
+_backend = RemoteBackend()
+
+def get_backend():
+    """
+    Returns the backend Author, Publication and search currently load from.
+    """
+    return _backend
+
+def set_backend(backend):
+    """
+    Switches every subsequent load to ``backend`` - eg a RemoteBackend, or a
+    dblp.dump.DumpBackend for offline use - and returns it.
+    """
+    global _backend
+    _backend = backend
+    return backend
 
-        self.data = data
+def load_many(publications, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Loads the data of every not-yet-loaded Publication in ``publications``
+    concurrently, over the shared client's connection pool, and returns the
+    publications as a list.
+    """
+    publications = list(publications)
+    pending = [p for p in publications if p.data is None]
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(lambda p: p.load_data(), pending):
+                pass
+    return publications
 
 def search(author_str):
-    resp = requests.get(DBLP_AUTHOR_SEARCH_URL, params={'xauthor':author_str})
-    #TODO error handling
-    root = etree.fromstring(resp.content)
-    return [Author(urlpt) for urlpt in root.xpath('/authors/author/@urlpt')]
+    """
+    Returns a list of Authors matching ``author_str``.
+    """
+    return get_backend().search(author_str)
+
+def iter_search(author_str, page_size=None):
+    """
+    Yields the Authors matching ``author_str`` as they are parsed. With a
+    ``page_size``, the remote backend pages through dblp's author search API
+    instead, fetching the next page only when the previous one is used up;
+    those Authors have a pid but no urlpt.
+    """
+    backend = get_backend()
+    if hasattr(backend, 'iter_search'):
+        return backend.iter_search(author_str, page_size=page_size)
+    return iter(backend.search(author_str))
+
+def iter_api_hits(url, query, page_size=API_MAX_PAGE_SIZE):
+    """
+    Yields the <info> element of every hit of ``query`` on the dblp search
+    API at ``url`` (eg DBLP_AUTHOR_API_URL), requesting ``page_size`` hits at
+    a time. The next page is only requested once the current one has been
+    consumed, and at most API_MAX_HITS hits are available.
+    """
+    page_size = min(page_size, API_MAX_PAGE_SIZE)
+    first = 0
+    while True:
+        resp = client.get(url, params={'q':query, 'format':'xml',
+                                       'h':page_size, 'f':first})
+        resp.raise_for_status()
+        hits = etree.fromstring(resp.content).find('hits')
+        if hits is None:
+            return
+        for info in hits.iterfind('hit/info'):
+            yield info
+        sent = int(hits.get('sent', 0))
+        first += sent
+        if not sent or first >= min(int(hits.get('total', 0)), API_MAX_HITS):
+            return
+
+def asearch(author_str):
+    """
+    Awaitable version of search.
+    """
+    return aio.call(search, author_str)
+
+def aload_many(items):
+    """
+    Awaitable version of load_many; loads Authors and Publications alike.
+    """
+    return aio.load_many(items)
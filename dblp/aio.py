@@ -0,0 +1,107 @@
+"""
+asyncio support for the dblp package.
+
+The blocking loads run on a dedicated thread pool over the shared pooled
+client, and a per-event-loop semaphore bounds how many are in flight, so one
+loop can fan out thousands of lookups without opening thousands of sockets.
+Unless set_concurrency() says otherwise, the bound is the default client's
+``pool_maxsize``, read when the pool and semaphores are made.
+"""
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from dblp import client
+
+# None follows the default client's pool_maxsize
+_concurrency = None
+_semaphores = weakref.WeakKeyDictionary()
+_executor = None
+_executor_limit = None
+_lock = threading.Lock()
+
+def set_concurrency(limit):
+    """
+    Sets the maximum number of loads in flight per event loop, or with None
+    goes back to following the client's ``pool_maxsize``. Keep it at or below
+    ``pool_maxsize`` to avoid waiting on the pool.
+    """
+    global _concurrency, _executor
+    if limit is not None and limit < 1:
+        raise ValueError('concurrency limit must be at least 1')
+    with _lock:
+        _concurrency = limit
+        _semaphores.clear()
+        previous, _executor = _executor, None
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+def concurrency():
+    """
+    Returns the current limit on loads in flight per event loop.
+    """
+    if _concurrency is not None:
+        return _concurrency
+    return client.get_client().pool_maxsize
+
+def _get_executor():
+    global _executor, _executor_limit
+    limit = concurrency()
+    with _lock:
+        previous = None
+        if _executor is not None and _executor_limit != limit:
+            # the client was reconfigured with another pool size
+            previous, _executor = _executor, None
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=limit,
+                                           thread_name_prefix='dblp-aio')
+            _executor_limit = limit
+        executor = _executor
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return executor
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    limit = concurrency()
+    with _lock:
+        entry = _semaphores.get(loop)
+        if entry is None or entry[0] != limit:
+            entry = _semaphores[loop] = (limit, asyncio.Semaphore(limit))
+        return entry[1]
+
+async def call(func, *args, **kwargs):
+    """
+    Runs the blocking ``func`` on the dblp thread pool once a concurrency slot
+    is free and returns its result.
+    """
+    async with _get_semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_executor(), functools.partial(func, *args, **kwargs))
+
+async def load(item):
+    """
+    Loads a LazyAPIData object (an Author or Publication) if it isn't loaded
+    yet and returns it.
+    """
+    if item.data is None:
+        await call(item.load_data)
+    return item
+
+async def load_many(items):
+    """
+    Loads every LazyAPIData object in ``items`` concurrently and returns them
+    as a list, in order.
+    """
+    return list(await asyncio.gather(*(load(item) for item in items)))
+
+async def prefetch_publications(author):
+    """
+    Loads ``author`` and then all of its publications concurrently, returning
+    the publications.
+    """
+    await load(author)
+    return await load_many(author.publications)
@@ -0,0 +1,218 @@
+"""
+A persistent, SQLite-backed HTTP response cache.
+
+Responses are keyed by their full URL (query string included) and kept for a
+TTL. Once stale they are revalidated with ETag/Last-Modified conditional
+requests rather than refetched, and the cache is trimmed back to its size
+bound by evicting the least recently used entries. The total size is kept
+as a running count rather than summed on every store; ``size`` comes after
+the body in each row, so summing it would read every stored body.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'revalidated',
+                                       'evictions'])
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS responses_accessed_at;
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at, url, size);
+'''
+
+class CacheEntry(namedtuple('CacheEntry', ['url', 'status', 'headers', 'body',
+                                           'etag', 'last_modified',
+                                           'expires_at'])):
+    """
+    A stored response. ``fresh`` tells whether it is still within its TTL.
+    """
+    __slots__ = ()
+
+    @property
+    def fresh(self):
+        return self.expires_at > time.time()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self):
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.url = self.url
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        return response
+
+class ResponseCache(object):
+    """
+    A disk-backed response cache. Safe to share between threads, and between
+    processes pointing at the same file.
+
+    Attributes:
+    path - the SQLite database file
+    ttl - seconds a stored response is served without revalidation
+    max_size - the total body size, in bytes, the cache is trimmed back to
+    stats - a (hits, misses, revalidated, evictions) named tuple of counts
+    since this object was created
+    """
+    def __init__(self, path, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._size = self._total_size()
+        self._hits = self._misses = self._revalidated = self._evictions = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._revalidated,
+                              self._evictions)
+
+    def lookup(self, url):
+        """
+        Returns the CacheEntry stored for ``url``, fresh or stale, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, status, headers, body, etag, last_modified, '
+                'expires_at FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute(
+                    'UPDATE responses SET accessed_at = ? WHERE url = ?',
+                    (time.time(), url))
+        url, status, headers, body, etag, last_modified, expires_at = row
+        return CacheEntry(url, status, json.loads(headers), bytes(body), etag,
+                          last_modified, expires_at)
+
+    def store(self, url, response, ttl=None):
+        """
+        Stores a response under ``url`` and evicts old entries if the cache
+        has outgrown ``max_size``.
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        body = response.content
+        headers = dict(response.headers)
+        with self._lock:
+            with self._db:
+                self._size -= self._stored_size(url)
+                self._db.execute(
+                    'INSERT OR REPLACE INTO responses VALUES '
+                    '(?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url, response.status_code, json.dumps(headers),
+                     sqlite3.Binary(body), headers.get('ETag'),
+                     headers.get('Last-Modified'), now + ttl, now, len(body)))
+            self._size += len(body)
+            self._evict()
+
+    def refresh(self, url, response, ttl=None):
+        """
+        Marks the entry for ``url`` fresh again after a 304 Not Modified,
+        picking up any new validators from ``response``, and returns it.
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    'UPDATE responses SET expires_at = ?, accessed_at = ?, '
+                    'etag = COALESCE(?, etag), '
+                    'last_modified = COALESCE(?, last_modified) '
+                    'WHERE url = ?',
+                    (now + ttl, now, response.headers.get('ETag'),
+                     response.headers.get('Last-Modified'), url))
+        return self.lookup(url)
+
+    def invalidate(self, url):
+        with self._lock:
+            with self._db:
+                self._size -= self._stored_size(url)
+                self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+
+    def clear(self):
+        with self._lock:
+            with self._db:
+                self._db.execute('DELETE FROM responses')
+            self._size = 0
+
+    def record(self, hit=False, revalidated=False):
+        """
+        Counts one lookup outcome in ``stats``.
+        """
+        with self._lock:
+            if revalidated:
+                self._revalidated += 1
+            elif hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _total_size(self):
+        # answered from the responses_lru index, without touching the bodies
+        return self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _stored_size(self, url):
+        row = self._db.execute('SELECT size FROM responses WHERE url = ?',
+                               (url,)).fetchone()
+        return row[0] if row else 0
+
+    def _evict(self):
+        if self._size <= self.max_size:
+            return
+        # other processes sharing the file change it too, so recount first
+        total = self._size = self._total_size()
+        if total <= self.max_size:
+            return
+        rows = self._db.execute(
+            'SELECT url, size FROM responses ORDER BY accessed_at')
+        doomed = []
+        for url, size in rows:
+            if total <= self.max_size:
+                break
+            doomed.append((url,))
+            total -= size
+        with self._db:
+            self._db.executemany('DELETE FROM responses WHERE url = ?', doomed)
+        self._size = total
+        self._evictions += len(doomed)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,256 @@
+"""
+The HTTP client layer shared by every dblp fetch.
+
+All requests go through one pooled ``requests.Session`` so TCP/TLS
+connections are kept alive and reused across calls instead of being opened
+afresh for each URL. Responses dblp sends when throttling (429, 503) are
+retried with backoff, paced by an optional RateLimiter, and an optional
+HostPool spreads requests over dblp's mirrors.
+"""
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from dblp import ratelimit
+
+DEFAULT_HEADERS = {
+    'Connection': 'keep-alive',
+    'User-Agent': 'dblp-python',
+}
+
+# statuses dblp answers with when a client is going too fast
+RETRY_STATUSES = (429, 503)
+# statuses after which a request is tried on another mirror; throttling is
+# left to the retries
+FAILOVER_STATUSES = (500, 502, 504)
+DEFAULT_RETRIES = 4
+
+ConnectionStats = namedtuple('ConnectionStats', ['opened', 'requests', 'reused'])
+
+class _Counters(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def opened_one(self):
+        with self.lock:
+            self.opened += 1
+
+    def requested_one(self):
+        with self.lock:
+            self.requests += 1
+
+    def snapshot(self):
+        with self.lock:
+            return ConnectionStats(self.opened, self.requests,
+                                   max(self.requests - self.opened, 0))
+
+def _counting_pool(pool_cls, counters):
+    """
+    Returns a subclass of the urllib3 pool class that records every socket
+    it connects and every connection it hands out in ``counters``.
+    """
+    class Connection(pool_cls.ConnectionCls):
+        def connect(self):
+            counters.opened_one()
+            return super(Connection, self).connect()
+
+    class Pool(pool_cls):
+        ConnectionCls = Connection
+
+        def _get_conn(self, timeout=None):
+            counters.requested_one()
+            return super(Pool, self)._get_conn(timeout=timeout)
+
+    return Pool
+
+class PooledAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter whose connection pools count connections opened vs.
+    reused. ``pool_connections`` is the number of per-host pools kept,
+    ``pool_maxsize`` the number of keep-alive connections kept per host and,
+    with ``pool_block``, the hard limit of concurrent connections per host.
+    """
+    def __init__(self, *args, **kwargs):
+        self.counters = _Counters()
+        super(PooledAdapter, self).__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(PooledAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.counters),
+            'https': _counting_pool(HTTPSConnectionPool, self.counters),
+        }
+
+    def __setstate__(self, state):
+        self.counters = _Counters()
+        super(PooledAdapter, self).__setstate__(state)
+
+class Client(object):
+    """
+    A pooled, keep-alive HTTP client for the dblp API.
+
+    Attributes:
+    session - the underlying requests.Session
+    timeout - the default timeout, in seconds, of every request
+    pool_maxsize - the keep-alive connections kept per host
+    cache - an optional ResponseCache consulted before the network
+    rate_limiter - an optional ratelimit.RateLimiter every request waits on
+    retries - how many times a throttled (429/503) request is retried
+    mirrors - an optional mirrors.HostPool that requests to dblp hosts are
+    spread over
+    stats - a (opened, requests, reused) named tuple of connection counts
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=True,
+                 timeout=30, headers=None, cache=None, rate_limiter=None,
+                 retries=DEFAULT_RETRIES, mirrors=None):
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.mirrors = mirrors
+        self.adapter = PooledAdapter(pool_connections=pool_connections,
+                                     pool_maxsize=pool_maxsize,
+                                     pool_block=pool_block)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def get(self, url, params=None, revalidate=False, **kwargs):
+        """
+        GETs ``url``, from the cache when it holds a fresh entry. With
+        ``revalidate``, a fresh entry is checked with dblp (conditionally)
+        as if it had gone stale.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if self.cache is None or kwargs.get('stream'):
+            return self._send(url, params=params, **kwargs)
+
+        url = requests.Request('GET', url, params=params).prepare().url
+        entry = self.cache.lookup(url)
+        if entry is not None and entry.fresh and not revalidate:
+            self.cache.record(hit=True)
+            return entry.to_response()
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        resp = self._send(url, headers=headers, **kwargs)
+        if entry is not None and resp.status_code == 304:
+            self.cache.record(revalidated=True)
+            return (self.cache.refresh(url, resp) or entry).to_response()
+        self.cache.record()
+        if resp.status_code == 200:
+            self.cache.store(url, resp)
+        return resp
+
+    def _send(self, url, **kwargs):
+        limiter = self.rate_limiter
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            resp = self._get(url, **kwargs)
+            if resp.status_code not in RETRY_STATUSES:
+                if limiter is not None:
+                    limiter.succeeded()
+                return resp
+            if attempt >= self.retries:
+                return resp
+            delay = ratelimit.retry_after(resp)
+            if limiter is not None:
+                # the limiter holds back every thread (and process) using it
+                limiter.throttled(delay, attempt)
+            else:
+                time.sleep(delay if delay is not None else
+                           ratelimit.backoff(attempt))
+            resp.close()
+            attempt += 1
+
+    def _get(self, url, **kwargs):
+        pool = self.mirrors
+        if pool is None or not pool.covers(url):
+            return self.session.get(url, **kwargs)
+        tried = []
+        while True:
+            host = pool.acquire(exclude=tried)
+            start = time.monotonic()
+            try:
+                resp = self.session.get(pool.rewrite(url, host), **kwargs)
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                pool.failed(host)
+                tried.append(host)
+                if len(tried) == len(pool.hosts):
+                    raise
+                continue
+            except BaseException:
+                pool.release(host)
+                raise
+            if resp.status_code in FAILOVER_STATUSES:
+                pool.failed(host)
+                tried.append(host)
+                if len(tried) < len(pool.hosts):
+                    resp.close()
+                    continue
+            elif resp.status_code in RETRY_STATUSES:
+                pool.release(host)
+            else:
+                pool.succeeded(host, time.monotonic() - start)
+            return resp
+
+    @property
+    def stats(self):
+        return self.adapter.counters.snapshot()
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.rate_limiter is not None:
+            self.rate_limiter.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Returns the process-wide default Client, creating it on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Client()
+        return _client
+
+def set_client(client):
+    """
+    Replaces the process-wide default Client, closing the previous one.
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None and previous is not client:
+        previous.close()
+    return client
+
+def configure(**kwargs):
+    """
+    Builds a new default Client from ``kwargs`` (see Client) and installs it.
+    """
+    return set_client(Client(**kwargs))
+
+def get(url, params=None, **kwargs):
+    """
+    Issues a GET through the default Client.
+    """
+    return get_client().get(url, params=params, **kwargs)
@@ -0,0 +1,102 @@
+"""
+Memoized collaboration years between authors.
+
+A CollaborationTable loads each author's publication list once and keeps, per
+author, the years they published with every coauthor. Whether two authors
+worked together recently is then a dictionary lookup rather than two profile
+downloads.
+"""
+import dblp
+from dblp import client, parsing
+
+def _author_for(name):
+    """
+    Returns the Author named ``name`` in dblp's author search, else the first
+    hit, or None. The pid is read off the search results, so no homonym's
+    profile is downloaded just to compare names.
+    """
+    response = client.get(dblp.DBLP_AUTHOR_SEARCH_URL,
+                          params={'xauthor': name})
+    response.raise_for_status()
+    pid = parsing.find_pid(response.content, name)
+    if pid is None:
+        pid = dblp.first_or_none(author.pid for author in
+                                 parsing.iter_authors(response.content)
+                                 if author.pid)
+    return dblp.Author(None, pid=pid) if pid else None
+
+def load_publications(author):
+    """
+    Returns (year, author names) pairs for the publications of ``author``, a
+    dblp.Author or a name to search for. This is the default loader of a
+    CollaborationTable.
+    """
+    if not isinstance(author, dblp.Author):
+        author = _author_for(author)
+        if author is None:
+            return []
+    return [(p.year, p.authors) for p in author.prefetch_publications()]
+
+class CollaborationTable(object):
+    """
+    Per-author collaboration years by coauthor, built once per author.
+
+    ``load(author)`` returns (year, author names) pairs for every publication
+    of ``author``; authors are whatever the loader accepts (names by default)
+    and coauthors are the names it returns. Publications without a year are
+    skipped.
+    """
+    def __init__(self, load=load_publications):
+        self.load = load
+        self.tables = {}
+
+    def add(self, author, publications):
+        """
+        Builds (or rebuilds) the table of ``author`` from (year, author names)
+        pairs already at hand, eg a parsed profile page, and returns it.
+        """
+        table = {}
+        for year, names in publications:
+            if year is None:
+                continue
+            for name in names or []:
+                if name != author:
+                    table.setdefault(name, set()).add(int(year))
+        table = self.tables[author] = dict(
+            (name, sorted(years)) for name, years in table.items())
+        return table
+
+    def years_by_coauthor(self, author):
+        """
+        Returns a dict from each coauthor of ``author`` to the sorted years
+        they published together, loading the author on first use.
+        """
+        table = self.tables.get(author)
+        if table is None:
+            table = self.add(author, self.load(author))
+        return table
+
+    def collaboration_years(self, a, b):
+        """
+        Returns the sorted years ``a`` and ``b`` published together. Only a's
+        publications are loaded, unless b's table is already built.
+        """
+        years = self.years_by_coauthor(a).get(b)
+        if years is None and b in self.tables:
+            years = self.tables[b].get(a)
+        return years or []
+
+    def last_collaboration_year(self, a, b):
+        """
+        Returns the latest year ``a`` and ``b`` published together, or None.
+        """
+        years = self.collaboration_years(a, b)
+        return years[-1] if years else None
+
+    def collaborated_since(self, a, b, year):
+        """
+        Returns whether ``a`` and ``b`` published together in or after
+        ``year``.
+        """
+        last = self.last_collaboration_year(a, b)
+        return last is not None and last >= year
@@ -0,0 +1,171 @@
+"""
+A breadth-first crawl frontier for multi-level coauthor expansion.
+
+Starting from seed pids, each level's authors are expanded concurrently, the
+top ``fanout`` coauthors of each (by collaboration count) become their
+children, and only coauthors not seen before are queued for the next level.
+Shared coauthors are therefore fetched once however many authors list them,
+and both the sunburst trees and the nodes/links graphs are produced from the
+one CrawlResult. An ``on_seed`` callback gets each seed as soon as its tree
+is complete, so a writer can save it before the rest of the crawl is done.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 8
+
+class CrawlResult(object):
+    """
+    The outcome of a crawl.
+
+    Attributes:
+    seeds - the seed pids, in the order given
+    expansions - a dict from every expanded pid to its list of child entries,
+    heaviest first. Entries are the dicts returned by the expand function,
+    each with at least "pid" and "count".
+    depths - a dict from every discovered pid to the level it was found at
+    """
+    def __init__(self, seeds):
+        self.seeds = list(seeds)
+        self.expansions = {}
+        self.depths = dict((pid, 0) for pid in self.seeds)
+
+    def children(self, pid):
+        return self.expansions.get(pid, [])
+
+    def to_tree(self, make_node, max_depth=None):
+        """
+        Returns the list of seed trees. ``make_node(entry, depth)`` builds
+        the dict for an entry (for seeds, the entry is {"pid": seed}). Nodes
+        above ``max_depth`` get a "children" list unless make_node sets one
+        itself. Expansions form a graph, not a tree, so a pid can appear
+        under several parents; ``max_depth`` bounds the nesting.
+        """
+        return list(self.iter_tree(make_node, max_depth))
+
+    def iter_tree(self, make_node, max_depth=None):
+        """
+        Like to_tree, but yields the seed trees one at a time, building each
+        only when it is asked for, so a writer can stream them out without
+        the whole forest in memory.
+        """
+        for seed in self.seeds:
+            yield self.tree(seed, make_node, max_depth)
+
+    def tree(self, seed, make_node, max_depth=None):
+        """
+        Returns the tree of one seed, built as in to_tree.
+        """
+        def build(entry, depth):
+            node = make_node(entry, depth)
+            if 'children' not in node and (max_depth is None or
+                                           depth < max_depth):
+                node['children'] = [build(child, depth + 1)
+                                    for child in self.children(entry['pid'])]
+            return node
+
+        return build({'pid': seed}, 0)
+
+    def settled(self, seed, depth, pending):
+        """
+        Returns whether the tree of ``seed`` down to ``depth`` is final: none
+        of its authors above ``depth`` is among the ``pending`` pids still
+        to be expanded.
+        """
+        stack = [(seed, 0)]
+        seen = set()
+        while stack:
+            pid, level = stack.pop()
+            if level >= depth or (pid, level) in seen:
+                continue
+            seen.add((pid, level))
+            if pid in self.expansions:
+                stack.extend((child['pid'], level + 1)
+                             for child in self.expansions[pid])
+            elif pid in pending:
+                return False
+        return True
+
+    def to_graph(self, node_id=None):
+        """
+        Returns {"nodes": [...], "links": [...]} with one node per discovered
+        pid and one link per parent/child expansion, weighted by count.
+        ``node_id(entry)`` picks the node id (the pid by default).
+        """
+        node_id = node_id or (lambda entry: entry['pid'])
+        entries = dict((pid, {'pid': pid}) for pid in self.seeds)
+        for children in self.expansions.values():
+            for child in children:
+                entries.setdefault(child['pid'], child)
+        nodes = [{'id': node_id(entry)} for entry in entries.values()]
+        links = []
+        for pid, children in self.expansions.items():
+            for child in children:
+                links.append({'source': node_id(entries[pid]),
+                              'target': node_id(child),
+                              'value': child['count']})
+        return {'nodes': nodes, 'links': links}
+
+def _report(result, done, depth, pending, on_seed):
+    """
+    Calls on_seed for the seeds from number ``done`` on whose trees have
+    settled, stopping at the first that hasn't, and returns the number of
+    seeds reported so far.
+    """
+    while done < len(result.seeds) and \
+            result.settled(result.seeds[done], depth, pending):
+        on_seed(result, result.seeds[done])
+        done += 1
+    return done
+
+def crawl(seeds, expand, depth=2, fanout=5, workers=DEFAULT_WORKERS,
+          max_authors=None, on_seed=None):
+    """
+    Crawls breadth-first from ``seeds`` (pids) and returns a CrawlResult.
+
+    ``expand(pid)`` returns the coauthor entries of an author as dicts with at
+    least "pid" and "count", or None if the author couldn't be fetched. It is
+    called at most once per pid, from up to ``workers`` threads. Authors at
+    levels below ``depth`` are expanded. Within a level, authors with higher
+    collaboration counts are expanded first, and ``max_authors``, if given,
+    caps the total number of expansions.
+
+    ``on_seed(result, seed)``, if given, is called for every seed in order,
+    from the calling thread, as soon as the seed's tree down to ``depth`` is
+    complete. Without ``max_authors`` a level is then expanded in the order
+    its authors were found instead, so the trees complete in seed order; the
+    same authors are expanded either way.
+    """
+    result = CrawlResult(seeds)
+    level = list(dict.fromkeys(seeds))
+    pending = set(level) if depth > 0 else set()
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for current_depth in range(depth):
+            if max_authors is not None:
+                kept = level[:max(max_authors - len(result.expansions), 0)]
+                pending.difference_update(level[len(kept):])
+                level = kept
+            if not level:
+                break
+            queued = {}
+            for pid, entries in zip(level, executor.map(expand, level)):
+                children = sorted((e for e in entries or [] if e.get('pid')),
+                                  key=lambda e: e['count'], reverse=True)
+                children = children[:fanout]
+                result.expansions[pid] = children
+                pending.discard(pid)
+                for child in children:
+                    if child['pid'] not in result.depths:
+                        result.depths[child['pid']] = current_depth + 1
+                        queued[child['pid']] = child['count']
+                        if current_depth + 1 < depth:
+                            pending.add(child['pid'])
+                if on_seed is not None:
+                    done = _report(result, done, depth, pending, on_seed)
+            level = list(queued)
+            if on_seed is None or max_authors is not None:
+                level.sort(key=queued.get, reverse=True)
+    if on_seed is not None:
+        pending.clear()
+        _report(result, done, depth, pending, on_seed)
+    return result
@@ -0,0 +1,219 @@
+"""
+An offline backend reading the official dblp.xml.gz dump.
+
+The dump is read once with a streaming ``iterparse`` pass that clears every
+record after use, so memory stays flat over the whole file, and is indexed
+into SQLite. A DumpBackend over that index then serves Author, Publication
+and search exactly as the live API does::
+
+    python -m dblp.dump dblp.xml.gz dblp.sqlite
+
+    import dblp
+    from dblp.dump import DumpBackend
+    dblp.set_backend(DumpBackend('dblp.sqlite'))
+
+The dump's dblp.dtd must sit next to dblp.xml.gz; it defines the character
+entities used throughout the file.
+"""
+import gzip
+import json
+import sqlite3
+import sys
+import threading
+import zlib
+
+from lxml import etree
+
+import dblp
+from dblp.parsing import RECORD_TAGS
+
+PERSON_KEY_PREFIX = 'homepages/'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT PRIMARY KEY,
+    mdate TEXT,
+    xml BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authorships (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    pid TEXT
+);
+CREATE TABLE IF NOT EXISTS persons (
+    pid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    aliases TEXT NOT NULL,
+    urls TEXT NOT NULL
+);
+'''
+
+_INDEXES = '''
+CREATE INDEX IF NOT EXISTS authorships_name ON authorships (name);
+'''
+
+BATCH_SIZE = 10000
+
+def iter_records(path):
+    """
+    Yields every top-level record element of a dblp XML dump (plain or
+    gzipped) in document order. Each element is cleared once the caller moves
+    on, so don't hold on to it.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as source:
+        # lxml resolves the DTD relative to source.name, ie next to the dump
+        context = etree.iterparse(source, events=('end',), tag=RECORD_TAGS,
+                                  load_dtd=True, resolve_entities=True,
+                                  no_network=True, huge_tree=True)
+        for _, element in context:
+            # records only ever appear directly under the <dblp> root
+            if element.getparent() is None or \
+                    element.getparent().getparent() is not None:
+                continue
+            yield element
+            element.clear(keep_tail=True)
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+def build_index(dump_path, index_path):
+    """
+    Indexes the dump at ``dump_path`` into a SQLite file at ``index_path``
+    and returns the number of records indexed.
+    """
+    db = sqlite3.connect(index_path)
+    db.executescript(_SCHEMA)
+    records, authorships, names, persons = [], [], set(), []
+    count = 0
+
+    def flush():
+        db.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?)',
+                       records)
+        db.executemany('INSERT INTO authorships VALUES (?, ?)', authorships)
+        db.executemany('INSERT OR IGNORE INTO names (name) VALUES (?)',
+                       [(n,) for n in names])
+        db.executemany('INSERT OR REPLACE INTO persons VALUES (?, ?, ?, ?)',
+                       persons)
+        del records[:], authorships[:], persons[:]
+        names.clear()
+
+    with db:
+        for element in iter_records(dump_path):
+            key = element.get('key')
+            authors = [a.text for a in element.iterfind('author') if a.text]
+            if element.tag == 'www' and key.startswith(PERSON_KEY_PREFIX):
+                if authors:
+                    persons.append((key[len(PERSON_KEY_PREFIX):], authors[0],
+                                    json.dumps(authors[1:]),
+                                    json.dumps([u.text for u in
+                                                element.iterfind('url')])))
+                continue
+            records.append((key, element.get('mdate'),
+                            zlib.compress(etree.tostring(element,
+                                                         encoding='utf-8'))))
+            authorships.extend((name, key) for name in authors)
+            names.update(authors)
+            count += 1
+            if len(records) >= BATCH_SIZE:
+                flush()
+        flush()
+        db.executescript(_INDEXES)
+        # point every name, aliases included, at its person record
+        for pid, name, aliases in db.execute(
+                'SELECT pid, name, aliases FROM persons').fetchall():
+            db.executemany('UPDATE names SET pid = ? WHERE name = ?',
+                           [(pid, n) for n in [name] + json.loads(aliases)])
+    db.close()
+    return count
+
+class DumpBackend(object):
+    """
+    Loads data from a SQLite index built by build_index. Authors are
+    identified by their dblp name (used as ``urlpt``) and, where the dump has
+    a person record for them, their pid.
+    """
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(index_path, check_same_thread=False)
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def _person(self, pid):
+        rows = self._query('SELECT name, aliases, urls FROM persons '
+                           'WHERE pid = ?', (pid,))
+        if not rows:
+            return None
+        name, aliases, urls = rows[0]
+        return name, json.loads(aliases), json.loads(urls)
+
+    def _record(self, key):
+        rows = self._query('SELECT xml FROM records WHERE key = ?', (key,))
+        if not rows:
+            raise ValueError(key)
+        return etree.fromstring(zlib.decompress(rows[0][0]))
+
+    def _person_keys(self, author):
+        pid = author.pid
+        if pid is None:
+            rows = self._query('SELECT pid FROM names WHERE name = ?',
+                               (author.urlpt,))
+            pid = rows[0][0] if rows else None
+        person = self._person(pid) if pid is not None else None
+        if person is not None:
+            name, aliases, homepages = person
+        else:
+            name, aliases, homepages = author.urlpt, [], []
+        keys = []
+        for n in [name] + aliases:
+            keys.extend(k for k, in self._query(
+                'SELECT key FROM authorships WHERE name = ? ORDER BY rowid',
+                (n,)))
+        return name, aliases, homepages, keys
+
+    def load_author(self, author):
+        name, aliases, homepages, keys = self._person_keys(author)
+        return {
+            'name':name,
+            'publications':[dblp.Publication.from_element(self._record(k))
+                            for k in keys],
+            'homepages':homepages,
+            'homonyms':aliases
+        }
+
+    def iter_publications(self, author):
+        for key in self._person_keys(author)[3]:
+            yield dblp.Publication.from_element(self._record(key))
+
+    def load_publication(self, publication):
+        return dblp.parse_publication(self._record(publication.key))
+
+    def search(self, author_str):
+        return list(self.iter_search(author_str))
+
+    def iter_search(self, author_str, page_size=None):
+        words = author_str.split()
+        if not words:
+            return
+        sql = 'SELECT name, pid FROM names WHERE ' + \
+            ' AND '.join(['name LIKE ?'] * len(words)) + ' ORDER BY name'
+        seen = set()
+        for name, pid in self._query(sql, ['%{}%'.format(w) for w in words]):
+            # aliases of one person all map to the same pid
+            if pid is None or pid not in seen:
+                seen.add(pid)
+                yield dblp.Author(name, pid=pid)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m dblp.dump DUMP.xml.gz INDEX.sqlite')
+    print('indexed {} records'.format(build_index(sys.argv[1], sys.argv[2])))
@@ -0,0 +1,332 @@
+"""
+A precomputed, weighted coauthor graph over a RecordStore.
+
+Requires NumPy (``pip install dblp-python[graph]``).
+
+The graph is held as CSR adjacency arrays indexed by the store's author ids.
+There are two levels:
+
+- the occurrence arrays keep one entry per (author, coauthor, record), with
+  the record's year and venue id, so edge weights can be recounted for any
+  venue and year-range facet;
+- the edge arrays keep one entry per (author, coauthor) with the total number
+  of records they share, for unfiltered queries.
+
+Both are sorted by coauthor within each author, so a top-k query is a slice,
+an optional mask and a partial sort over one author's neighbourhood.
+"""
+import json
+import os
+
+import numpy as np
+
+from dblp.store import NO_VENUE
+
+# records with more authors than this are left out of the graph; they add
+# n^2 edges each and say little about who works with whom
+MAX_AUTHORS = 100
+
+_ARRAYS = ('indptr', 'neighbors', 'years', 'venues', 'edge_indptr',
+           'edge_neighbors', 'edge_weights')
+
+def _column(buffer, dtype):
+    return np.frombuffer(buffer, dtype=dtype) if len(buffer) else \
+        np.zeros(0, dtype=dtype)
+
+def _segment_positions(starts, lengths):
+    """
+    Returns, for every segment, the indices starts[i] .. starts[i] +
+    lengths[i] - 1, concatenated.
+    """
+    total = int(lengths.sum())
+    firsts = np.cumsum(lengths) - lengths
+    return np.repeat(starts, lengths) + \
+        (np.arange(total) - np.repeat(firsts, lengths))
+
+def coauthor_pairs(store, start=0, stop=None, max_authors=MAX_AUTHORS):
+    """
+    Returns (authors, coauthors, years, venues) arrays with one entry per
+    ordered pair of distinct authors of every row in [start, stop).
+    """
+    stop = len(store) if stop is None else stop
+    offsets = _column(store.author_offsets, np.uint32).astype(np.int64)
+    ids = _column(store.author_ids, np.uint32)
+    rows = np.arange(start, stop)
+    begins = offsets[start:stop]
+    lengths = offsets[start + 1:stop + 1] - begins
+    keep = lengths > 1
+    if max_authors:
+        keep &= lengths <= max_authors
+    rows, begins, lengths = rows[keep], begins[keep], lengths[keep]
+
+    # every author position of a row, then every position paired with each
+    # position of the same row
+    segment = np.repeat(np.arange(len(rows)), lengths)
+    positions = _segment_positions(begins, lengths)
+    pair_segment = np.repeat(segment, lengths[segment])
+    sources = np.repeat(positions, lengths[segment])
+    targets = _segment_positions(begins[segment], lengths[segment])
+
+    authors, coauthors = ids[sources], ids[targets]
+    distinct = authors != coauthors
+    pair_rows = rows[pair_segment[distinct]]
+    return (authors[distinct], coauthors[distinct],
+            _column(store.years, np.uint16)[pair_rows],
+            _column(store.venues, np.int32)[pair_rows])
+
+class CoauthorGraph(object):
+    """
+    A weighted coauthor graph with venue and year facets.
+
+    Attributes:
+    size - the number of author ids (nodes)
+    rows_seen - how many rows of the store have been added
+    indptr, neighbors, years, venues - the per-record occurrence CSR arrays
+    edge_indptr, edge_neighbors, edge_weights - the collapsed edge CSR arrays
+    store - the RecordStore the graph was built from, if known, used to
+    resolve venue names
+    """
+    def __init__(self, size=0, store=None, max_authors=MAX_AUTHORS):
+        self.size = size
+        self.store = store
+        self.max_authors = max_authors
+        self.rows_seen = 0
+        self.indptr = np.zeros(size + 1, dtype=np.int64)
+        self.neighbors = np.zeros(0, dtype=np.uint32)
+        self.years = np.zeros(0, dtype=np.uint16)
+        self.venues = np.zeros(0, dtype=np.int32)
+        self.edge_indptr = np.zeros(size + 1, dtype=np.int64)
+        self.edge_neighbors = np.zeros(0, dtype=np.uint32)
+        self.edge_weights = np.zeros(0, dtype=np.uint32)
+
+    @classmethod
+    def build(cls, store, max_authors=MAX_AUTHORS):
+        """
+        Builds the graph of every row of ``store``.
+        """
+        graph = cls(len(store.names), store=store, max_authors=max_authors)
+        graph.update(store)
+        return graph
+
+    def update(self, store=None, stop=None):
+        """
+        Adds the rows of ``store`` past rows_seen (up to ``stop``), to build
+        a large graph in chunks. Every chunk must come from the same store:
+        StoreBuilder.close() renumbers the authors by name, so a rebuilt or
+        grown store has different author ids and needs a fresh build().
+
+        Only the chunk's pairs are sorted; they are then merged into the
+        existing arrays, which costs one copy of each array per chunk.
+        Within an edge, the occurrences of a later chunk follow the earlier
+        ones.
+        """
+        store = store if store is not None else self.store
+        stop = len(store) if stop is None else stop
+        if stop <= self.rows_seen:
+            return self
+        authors, neighbors, years, venues = coauthor_pairs(
+            store, self.rows_seen, stop, self.max_authors)
+        order = np.lexsort((years, neighbors, authors))
+        authors, neighbors = authors[order], neighbors[order]
+        years, venues = years[order], venues[order]
+
+        # (author, coauthor) keys are sorted in the existing and the new
+        # arrays alike, so the new entries go in by binary search
+        size = max(self.size, len(store.names))
+        width = max(size, 1)
+        keys = authors.astype(np.int64) * width + neighbors
+        old_keys = self._keys(self.indptr, self.neighbors, width)
+        at = np.searchsorted(old_keys, keys, side='right')
+        self.neighbors = np.insert(self.neighbors, at, neighbors)
+        self.years = np.insert(self.years, at, years)
+        self.venues = np.insert(self.venues, at, venues)
+        self.indptr = self._grow(self.indptr, size, authors)
+
+        # add the chunk's counts to the edges it shares with the graph and
+        # insert the others
+        keys, starts, counts = np.unique(keys, return_index=True,
+                                         return_counts=True)
+        old_keys = self._keys(self.edge_indptr, self.edge_neighbors, width)
+        at = np.searchsorted(old_keys, keys)
+        found = at < len(old_keys)
+        found[found] = old_keys[at[found]] == keys[found]
+        self.edge_weights = np.array(self.edge_weights, dtype=np.uint32)
+        self.edge_weights[at[found]] += counts[found].astype(np.uint32)
+        fresh = ~found
+        self.edge_neighbors = np.insert(self.edge_neighbors, at[fresh],
+                                        neighbors[starts[fresh]])
+        self.edge_weights = np.insert(self.edge_weights, at[fresh],
+                                      counts[fresh].astype(np.uint32))
+        self.edge_indptr = self._grow(self.edge_indptr, size,
+                                      authors[starts[fresh]])
+        self.size = size
+        self.rows_seen = stop
+        if self.store is None:
+            self.store = store
+        return self
+
+    @staticmethod
+    def _keys(indptr, neighbors, width):
+        authors = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64),
+                            np.diff(indptr))
+        return authors * width + neighbors
+
+    @staticmethod
+    def _grow(indptr, size, authors):
+        """
+        Returns ``indptr`` widened to ``size`` authors with one more entry
+        for each id in ``authors``.
+        """
+        counts = np.bincount(authors, minlength=size).astype(np.int64)
+        counts[:len(indptr) - 1] += np.diff(indptr)
+        grown = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(counts, out=grown[1:])
+        return grown
+
+    def venue_ids(self, venue):
+        """
+        Returns an array of venue ids for a venue name or id, or a list of
+        them. Unknown names match nothing.
+        """
+        if isinstance(venue, (str, int, np.integer)):
+            venue = [venue]
+        ids = []
+        for v in venue:
+            if isinstance(v, str):
+                v = self.store.venue_id(v) if self.store is not None else None
+                v = NO_VENUE - 1 if v is None else v
+            ids.append(v)
+        return np.array(ids, dtype=np.int32)
+
+    def coauthors(self, author, venue=None, years=None):
+        """
+        Returns (coauthor ids, weights) arrays for ``author``, counting only
+        records in ``venue`` (a name, id or list of them) and within the
+        inclusive ``years`` (first, last) range when given.
+        """
+        if venue is None and years is None:
+            lo, hi = self.edge_indptr[author], self.edge_indptr[author + 1]
+            return self.edge_neighbors[lo:hi], self.edge_weights[lo:hi]
+        lo, hi = self.indptr[author], self.indptr[author + 1]
+        mask = self._facet_mask(slice(lo, hi), venue, years)
+        neighbors, weights = np.unique(self.neighbors[lo:hi][mask],
+                                       return_counts=True)
+        return neighbors, weights
+
+    def _facet_mask(self, selection, venue, years):
+        mask = np.ones(len(self.neighbors[selection]), dtype=bool)
+        if venue is not None:
+            mask &= np.isin(self.venues[selection], self.venue_ids(venue))
+        if years is not None:
+            first, last = years
+            year = self.years[selection]
+            mask &= (year >= first) & (year <= last)
+        return mask
+
+    def top_coauthors(self, author, k=5, venue=None, years=None):
+        """
+        Returns up to ``k`` (coauthor id, weight) pairs for ``author``,
+        heaviest first, ties broken by coauthor id.
+        """
+        neighbors, weights = self.coauthors(author, venue=venue, years=years)
+        weights = weights.astype(np.int64)
+        if len(neighbors) > k:
+            # keep every coauthor tied with the k-th weight so ties still
+            # break by id
+            kth = -np.partition(-weights, k - 1)[k - 1]
+            keep = weights >= kth
+            neighbors, weights = neighbors[keep], weights[keep]
+        order = np.lexsort((neighbors, -weights))[:k]
+        return [(int(n), int(w)) for n, w in zip(neighbors[order],
+                                                 weights[order])]
+
+    def top_coauthors_many(self, authors, k=5, venue=None, years=None,
+                           index=None):
+        """
+        Returns the top_coauthors of every author in ``authors`` at once, as a
+        list in the same order. Each author is an author id, a list of ids
+        counted as one person, or a pid string, which ``index`` (an
+        AuthorIndex) resolves to all of that person's names.
+
+        The counts for the whole cohort are computed together: the cohort's
+        neighbourhoods are gathered into flat arrays, masked by the facets,
+        summed per (member, coauthor) and ranked with one lexsort.
+        """
+        members = []
+        for author in authors:
+            if isinstance(author, str):
+                if index is None:
+                    raise ValueError('resolving pids needs an AuthorIndex')
+                members.append(index.author_ids(author))
+            elif isinstance(author, (list, tuple)):
+                members.append(list(author))
+            else:
+                members.append([author])
+        ids = np.array([i for m in members for i in m], dtype=np.int64)
+        labels = np.repeat(np.arange(len(members)),
+                           [len(m) for m in members])
+
+        faceted = venue is not None or years is not None
+        indptr = self.indptr if faceted else self.edge_indptr
+        starts, lengths = indptr[ids], indptr[ids + 1] - indptr[ids]
+        positions = _segment_positions(starts, lengths)
+        member = np.repeat(labels, lengths)
+        if faceted:
+            neighbors = self.neighbors[positions]
+            mask = self._facet_mask(positions, venue, years)
+            member, neighbors = member[mask], neighbors[mask]
+            weights = np.ones(len(neighbors), dtype=np.int64)
+        else:
+            neighbors = self.edge_neighbors[positions]
+            weights = self.edge_weights[positions].astype(np.int64)
+
+        # sum weights per (member, coauthor), since one person's alias ids
+        # may share coauthors, and drop a person's own aliases
+        width = max(self.size, 1)
+        keys = member.astype(np.int64) * width + neighbors
+        own = np.isin(keys, labels * width + ids)
+        keys, weights = keys[~own], weights[~own]
+        keys, inverse = np.unique(keys, return_inverse=True)
+        weights = np.bincount(inverse, weights=weights).astype(np.int64)
+        member, neighbors = keys // width, keys % width
+
+        order = np.lexsort((neighbors, -weights, member))
+        member, neighbors, weights = member[order], neighbors[order], \
+            weights[order]
+        group_starts = np.searchsorted(member, np.arange(len(members)))
+        rank = np.arange(len(member)) - group_starts[member]
+        keep = rank < k
+        results = [[] for _ in members]
+        for m, n, w in zip(member[keep].tolist(), neighbors[keep].tolist(),
+                           weights[keep].tolist()):
+            results[m].append((n, w))
+        return results
+
+    def save(self, directory):
+        """
+        Saves the graph as .npy files in ``directory`` (eg the store's).
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, 'graph_{}.npy'.format(name)),
+                    getattr(self, name))
+        with open(os.path.join(directory, 'graph_meta.json'), 'w') as f:
+            json.dump({'size': self.size, 'rows_seen': self.rows_seen,
+                       'max_authors': self.max_authors}, f)
+
+    @classmethod
+    def load(cls, directory, store=None):
+        """
+        Loads a graph saved by save(), memory-mapping its arrays.
+        """
+        with open(os.path.join(directory, 'graph_meta.json')) as f:
+            meta = json.load(f)
+        graph = cls(store=store, max_authors=meta['max_authors'])
+        graph.size = meta['size']
+        graph.rows_seen = meta['rows_seen']
+        for name in _ARRAYS:
+            setattr(graph, name, np.load(
+                os.path.join(directory, 'graph_{}.npy'.format(name)),
+                mmap_mode='r'))
+        return graph
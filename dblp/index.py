@@ -0,0 +1,156 @@
+"""
+An author-to-record inverted index over a RecordStore.
+
+The store already maps each row to its author ids; the index adds the
+transpose, each author id's rows in ascending order, written next to the
+store and memory-mapped like its columns. "Papers co-written by A and B in
+venue V" is then an intersection of two sorted row lists rather than a scan
+over every record.
+"""
+import os
+import sys
+from array import array
+
+from dblp.store import RecordStore
+
+OFFSETS_COLUMN = 'index_offsets.I'
+ROWS_COLUMN = 'index_rows.I'
+PID_ORDER_COLUMN = 'index_pid_order.I'
+
+def intersect(*lists):
+    """
+    Returns the values common to every sorted list in ``lists``, in order.
+    """
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    result = list(lists[0])
+    for other in lists[1:]:
+        merged, i, n = [], 0, len(other)
+        for value in result:
+            while i < n and other[i] < value:
+                i += 1
+            if i == n:
+                break
+            if other[i] == value:
+                merged.append(value)
+        result = merged
+    return result
+
+def union(*lists):
+    """
+    Returns the sorted, de-duplicated union of the sorted lists in ``lists``.
+    """
+    return sorted(set().union(*lists))
+
+def build_index(store):
+    """
+    Writes the inverted index of ``store`` next to its columns, with a
+    counting sort over the author-id column, and returns an AuthorIndex.
+    """
+    names = len(store.names)
+    counts = array('I', bytes(4 * (names + 1)))
+    for author in store.author_ids:
+        counts[author + 1] += 1
+    offsets = counts
+    for i in range(names):
+        offsets[i + 1] += offsets[i]
+    fill = offsets[:-1]
+    rows = array('I', bytes(4 * len(store.author_ids)))
+    author_offsets, author_ids = store.author_offsets, store.author_ids
+    for row in range(len(store)):
+        for i in range(author_offsets[row], author_offsets[row + 1]):
+            author = author_ids[i]
+            rows[fill[author]] = row
+            fill[author] += 1
+    # author ids that have a pid, ordered by pid, so a person's names are
+    # found by binary search
+    pids = store.name_pids
+    pid_order = array('I', sorted((i for i in range(len(pids)) if pids.raw(i)),
+                                  key=lambda i: (bytes(pids.raw(i)), i)))
+    for name, column in [(OFFSETS_COLUMN, offsets), (ROWS_COLUMN, rows),
+                         (PID_ORDER_COLUMN, pid_order)]:
+        with open(os.path.join(store.directory, name), 'wb') as f:
+            column.tofile(f)
+    return AuthorIndex(store)
+
+class AuthorIndex(object):
+    """
+    The inverted index written by build_index for ``store``.
+
+    Authors are given either as author ids of the store or as pids, in which
+    case the rows of every name of that person are merged.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.offsets = store.map_column(OFFSETS_COLUMN, 'I')
+        self.rows_column = store.map_column(ROWS_COLUMN, 'I')
+        self.pid_order = store.map_column(PID_ORDER_COLUMN, 'I')
+
+    def rows(self, author_id):
+        """
+        Returns the sorted rows authored by ``author_id``.
+        """
+        return self.rows_column[self.offsets[author_id]:
+                                self.offsets[author_id + 1]].tolist()
+
+    def author_ids(self, pid):
+        """
+        Returns the author ids of every name of the person ``pid``.
+        """
+        pids, order = self.store.name_pids, self.pid_order
+        target = pid.encode('utf-8')
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(pids.raw(order[mid])) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        ids = []
+        while lo < len(order) and bytes(pids.raw(order[lo])) == target:
+            ids.append(order[lo])
+            lo += 1
+        return ids
+
+    def rows_for_pid(self, pid):
+        """
+        Returns the sorted rows authored by the person ``pid`` under any of
+        their names.
+        """
+        ids = self.author_ids(pid)
+        if len(ids) == 1:
+            return self.rows(ids[0])
+        return union(*(self.rows(i) for i in ids))
+
+    def pids(self, row):
+        """
+        Returns the pids of the authors of ``row`` (None for authors without
+        a person record).
+        """
+        return [self.store.name_pids[i] or None
+                for i in self.store.authors(row)]
+
+    def coauthored(self, authors, venue=None, years=None):
+        """
+        Returns the sorted rows co-written by all of ``authors`` (author ids
+        or pid strings), optionally restricted to one ``venue`` (a name or
+        venue id) and an inclusive ``years`` (first, last) range.
+        """
+        rows = intersect(*(self.rows_for_pid(a) if isinstance(a, str)
+                           else self.rows(a) for a in authors))
+        if venue is not None:
+            if isinstance(venue, str):
+                venue = self.store.venue_id(venue)
+            venues = self.store.venues
+            rows = [r for r in rows if venues[r] == venue]
+        if years is not None:
+            first, last = years
+            year_column = self.store.years
+            rows = [r for r in rows if first <= year_column[r] <= last]
+        return rows
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit('usage: python -m dblp.index STORE_DIR')
+    build_index(RecordStore(sys.argv[1]))
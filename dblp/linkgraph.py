@@ -0,0 +1,229 @@
+"""
+A compact file format for the nodes/links graphs the scripts write.
+
+The JSON graphs repeat an author's full name in every link they are part
+of, so most of a file like coauthors_collab.json is the same few thousand
+names over and over. A LinkGraph keeps each distinct name once, as offsets
+into one UTF-8 blob, and the links as int32 arrays of name numbers, all in
+one .npz file::
+
+    graph = LinkGraph.from_json_file("coauthors_collab.json")
+    graph.save("coauthors_collab.npz")
+    graph = LinkGraph.load("coauthors_collab.npz")
+    graph.write_json("coauthors_collab.json")  # the same document again
+
+Requires NumPy (``pip install dblp-python[graph]``). To convert from the
+command line::
+
+    python -m dblp.linkgraph coauthors_collab.json coauthors_collab.npz
+"""
+import json
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from dblp.output import GraphWriter
+from dblp.store import _Heap
+
+FORMAT_VERSION = 1
+
+class LinkGraphBuilder(object):
+    """
+    Collects nodes and links one at a time, through the same add_node() and
+    add_link() as a GraphWriter, and numbers the names as they come.
+
+    Nodes are {"id": name} dicts and links {"source": name, "target": name}
+    dicts with an optional numeric "value", which every link must then have.
+    """
+    def __init__(self):
+        self._numbers = {}
+        self._nodes = array('i')
+        self._sources = array('i')
+        self._targets = array('i')
+        self._weights = []
+
+    def _number(self, name):
+        if not isinstance(name, str):
+            raise ValueError('node ids must be strings, not {!r}'.format(name))
+        return self._numbers.setdefault(name, len(self._numbers))
+
+    def add_node(self, node):
+        if set(node) != {'id'}:
+            raise ValueError('unsupported node fields: {}'.format(
+                sorted(set(node) - {'id'})))
+        self._nodes.append(self._number(node['id']))
+
+    def add_link(self, link):
+        fields = set(link) - {'source', 'target', 'value'}
+        if fields or 'source' not in link or 'target' not in link:
+            raise ValueError('unsupported link fields: {}'.format(
+                sorted(set(link))))
+        if self._sources and ('value' in link) != bool(self._weights):
+            raise ValueError('either every link has a value or none has')
+        self._sources.append(self._number(link['source']))
+        self._targets.append(self._number(link['target']))
+        if 'value' in link:
+            self._weights.append(link['value'])
+
+    def build(self):
+        """
+        Returns the LinkGraph of everything added so far.
+        """
+        encoded = [name.encode('utf-8') for name in self._numbers]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        weights = np.asarray(self._weights) if self._weights else None
+        return LinkGraph(_Heap(offsets, blob),
+                         np.asarray(self._nodes, dtype=np.int32),
+                         np.asarray(self._sources, dtype=np.int32),
+                         np.asarray(self._targets, dtype=np.int32), weights)
+
+class LinkGraph(object):
+    """
+    A nodes/links graph with its names interned.
+
+    Attributes:
+    names - every distinct node id, indexed by name number; a sequence backed
+    by ``names.offsets`` and the UTF-8 ``names.blob``
+    nodes - the name numbers of the graph's "nodes" entries, in order. Links
+    may name authors that aren't among them.
+    sources, targets - the name numbers of each link's ends
+    weights - each link's "value", or None if the links have none
+    """
+    def __init__(self, names, nodes, sources, targets, weights=None):
+        self.names = names
+        self.nodes = nodes
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_json(cls, graph):
+        """
+        Builds a LinkGraph from a {"nodes": [...], "links": [...]} dict.
+        """
+        builder = LinkGraphBuilder()
+        for node in graph.get('nodes', ()):
+            builder.add_node(node)
+        for link in graph.get('links', ()):
+            builder.add_link(link)
+        return builder.build()
+
+    @classmethod
+    def from_json_file(cls, path):
+        with open(path) as f:
+            return cls.from_json(json.load(f))
+
+    def name_list(self):
+        """
+        Returns the names as a list of str, decoded in one go.
+        """
+        blob = self.names.blob.tobytes()
+        offsets = self.names.offsets.tolist()
+        return [blob[start:end].decode('utf-8')
+                for start, end in zip(offsets, offsets[1:])]
+
+    def iter_nodes(self):
+        names = self.name_list()
+        for number in self.nodes.tolist():
+            yield {'id': names[number]}
+
+    def iter_links(self):
+        names = self.name_list()
+        if self.weights is None:
+            for source, target in zip(self.sources.tolist(),
+                                      self.targets.tolist()):
+                yield {'source': names[source], 'target': names[target]}
+        else:
+            for source, target, value in zip(self.sources.tolist(),
+                                             self.targets.tolist(),
+                                             self.weights.tolist()):
+                yield {'source': names[source], 'target': names[target],
+                       'value': value}
+
+    def to_json(self):
+        """
+        Returns the graph as the {"nodes": [...], "links": [...]} dict it
+        was built from.
+        """
+        return {'nodes': list(self.iter_nodes()),
+                'links': list(self.iter_links())}
+
+    def write_json(self, file, indent=None, lines=False):
+        """
+        Streams the graph out as JSON (or JSON Lines) with a GraphWriter.
+        """
+        with GraphWriter(file, indent=indent, lines=lines) as writer:
+            for node in self.iter_nodes():
+                writer.add_node(node)
+            for link in self.iter_links():
+                writer.add_link(link)
+
+    def save(self, path, compressed=False):
+        """
+        Saves the graph as an .npz file at ``path``, zlib-compressed if
+        ``compressed``, which makes it smaller but slower to load.
+        """
+        arrays = {'version': np.array(FORMAT_VERSION),
+                  'name_offsets': np.asarray(self.names.offsets),
+                  'name_blob': np.asarray(self.names.blob),
+                  'nodes': self.nodes, 'sources': self.sources,
+                  'targets': self.targets}
+        if self.weights is not None:
+            arrays['weights'] = self.weights
+        with open(path, 'wb') as f:
+            (np.savez_compressed if compressed else np.savez)(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a graph saved by save().
+        """
+        with np.load(path) as data:
+            if int(data['version']) != FORMAT_VERSION:
+                raise ValueError('{} has format version {}, expected {}'.format(
+                    path, int(data['version']), FORMAT_VERSION))
+            weights = data['weights'] if 'weights' in data.files else None
+            return cls(_Heap(data['name_offsets'], data['name_blob']),
+                       data['nodes'], data['sources'], data['targets'],
+                       weights)
+
+def convert(json_path, npz_path, compressed=False):
+    """
+    Converts the nodes/links JSON file at ``json_path`` to a LinkGraph file
+    at ``npz_path`` and returns the graph.
+    """
+    graph = LinkGraph.from_json_file(json_path)
+    graph.save(npz_path, compressed=compressed)
+    return graph
+
+def _timed(load, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m dblp.linkgraph GRAPH.json GRAPH.npz')
+    json_path, npz_path = sys.argv[1:]
+    graph = convert(json_path, npz_path)
+
+    def load_json():
+        with open(json_path) as f:
+            json.load(f)
+
+    print('{} names, {} nodes, {} links'.format(
+        len(graph.names), len(graph.nodes), len(graph.sources)))
+    print('size: {} -> {} bytes'.format(os.path.getsize(json_path),
+                                        os.path.getsize(npz_path)))
+    print('load: {:.2f} -> {:.2f} ms'.format(
+        _timed(load_json) * 1000,
+        _timed(lambda: LinkGraph.load(npz_path)) * 1000))
@@ -0,0 +1,150 @@
+"""
+Spreading requests over dblp's mirrors.
+
+dblp is served from several hosts with the same paths. A HostPool tracks an
+exponentially weighted moving average of each host's latency and how many
+requests it has in flight, sends each request to the host with the lowest
+expected wait, and takes a host out of rotation for a growing cooldown when
+it fails (connection errors, timeouts, 500, 502 and 504). Give one to the Client::
+
+    client.configure(mirrors=HostPool())
+
+and every URL on a known dblp host is sent to the best mirror instead; the
+URL the caller gave, and so the cache key, stays as it was.
+"""
+import random
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_HOSTS = ('https://dblp.org', 'https://dblp.uni-trier.de',
+                 'https://dblp.dagstuhl.de')
+
+# hosts that serve dblp but aren't in the pool are still rewritten
+KNOWN_HOSTS = ('dblp.org', 'dblp.uni-trier.de', 'dblp.dagstuhl.de')
+
+DEFAULT_ALPHA = 0.3
+DEFAULT_COOLDOWN = 30.0
+MAX_COOLDOWN = 600.0
+
+HostStats = namedtuple('HostStats', ['base', 'latency', 'in_flight',
+                                     'requests', 'failures', 'down_for'])
+
+class _Host(object):
+    def __init__(self, base):
+        parts = urlsplit(base)
+        self.base = base
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.latency = None
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+
+class HostPool(object):
+    """
+    A pool of interchangeable dblp hosts, given as base URLs (scheme and
+    host, eg "https://dblp.org" or a local "http://127.0.0.1:8080"). URLs on
+    any of these hosts, or on a KNOWN_HOSTS name, are routed through the
+    pool.
+
+    Attributes:
+    alpha - the weight of the newest sample in the latency average
+    cooldown - how long a failing host is skipped; it doubles with every
+    failure in a row, up to MAX_COOLDOWN
+    stats - a list of HostStats, one per host
+    """
+    def __init__(self, hosts=DEFAULT_HOSTS, alpha=DEFAULT_ALPHA,
+                 cooldown=DEFAULT_COOLDOWN, clock=time.monotonic):
+        if not hosts:
+            raise ValueError('a HostPool needs at least one host')
+        self.hosts = [_Host(base.rstrip('/')) for base in hosts]
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._netlocs = set(KNOWN_HOSTS) | set(h.netloc for h in self.hosts)
+
+    def covers(self, url):
+        """
+        Returns whether ``url`` is on a host this pool can stand in for.
+        """
+        return urlsplit(url).netloc in self._netlocs
+
+    def rewrite(self, url, host):
+        """
+        Returns ``url`` moved onto ``host``.
+        """
+        parts = urlsplit(url)
+        return urlunsplit((host.scheme, host.netloc, parts.path, parts.query,
+                           parts.fragment))
+
+    def acquire(self, exclude=()):
+        """
+        Picks the host to send the next request to, skipping ``exclude``, and
+        counts the request as in flight on it. Hosts never measured come
+        first, then the one with the lowest latency times requests in flight;
+        if every host is cooling down, the one back soonest is tried. Returns
+        None once every host has been excluded.
+        """
+        with self._lock:
+            now = self.clock()
+            candidates = [h for h in self.hosts if h not in exclude]
+            if not candidates:
+                return None
+            up = [h for h in candidates if h.down_until <= now]
+            if up:
+                scores = [(h.latency or 0.0) * (h.in_flight + 1) for h in up]
+                best = min(scores)
+                host = random.choice([h for h, s in zip(up, scores)
+                                      if s == best])
+            else:
+                host = min(candidates, key=lambda h: h.down_until)
+            host.in_flight += 1
+            host.requests += 1
+            return host
+
+    def succeeded(self, host, elapsed):
+        """
+        Records that a request to ``host`` completed in ``elapsed`` seconds.
+        """
+        with self._lock:
+            host.in_flight -= 1
+            host.consecutive_failures = 0
+            host.down_until = 0.0
+            if host.latency is None:
+                host.latency = elapsed
+            else:
+                host.latency += self.alpha * (elapsed - host.latency)
+
+    def release(self, host):
+        """
+        Records that a request to ``host`` ended without telling anything
+        about the host, eg it was throttled or redirected in a loop.
+        """
+        with self._lock:
+            host.in_flight -= 1
+
+    def failed(self, host):
+        """
+        Records that a request to ``host`` failed, taking the host out of
+        rotation for a while.
+        """
+        with self._lock:
+            host.in_flight -= 1
+            host.failures += 1
+            host.consecutive_failures += 1
+            host.down_until = self.clock() + min(
+                MAX_COOLDOWN,
+                self.cooldown * 2 ** (host.consecutive_failures - 1))
+
+    @property
+    def stats(self):
+        with self._lock:
+            now = self.clock()
+            return [HostStats(h.base, h.latency, h.in_flight, h.requests,
+                              h.failures, max(h.down_until - now, 0.0))
+                    for h in self.hosts]
@@ -0,0 +1,199 @@
+"""
+Streaming writers for the sunburst trees and nodes/links graphs.
+
+The scripts' outputs are one JSON document for the D3 frontends, eg
+{"name": ..., "children": [...]}. Building the whole tree and dumping it at
+the end holds it in memory twice and leaves nothing behind if the run dies
+near the end. These writers instead take one finished subtree, node or link
+at a time, write it out and flush, so memory stays flat whatever the cohort
+size::
+
+    with TreeWriter("final_ese_coauthors.json", {"name": "ESE Authors"},
+                    indent=2) as writer:
+        for subtree in subtrees:
+            writer.write(subtree)
+
+The document is byte-for-byte what ``json.dump`` would have written with the
+same ``indent``. With ``lines=True`` the output is JSON Lines instead, one
+subtree, node or link per line, for feeding other tools.
+"""
+import json
+import shutil
+import tempfile
+
+# links are kept in memory up to this size before spilling to disk
+SPOOL_SIZE = 1024 * 1024
+
+def _open(file):
+    if hasattr(file, 'write'):
+        return file, False
+    return open(file, 'w'), True
+
+def _split(document, count):
+    """
+    Splits the JSON text ``document`` around its last ``count`` empty arrays
+    and returns the count + 1 pieces in between.
+    """
+    pieces = []
+    for _ in range(count):
+        at = document.rfind('[]')
+        pieces.insert(0, document[at + 2:])
+        document = document[:at]
+    pieces.insert(0, document)
+    return pieces
+
+class _Array(object):
+    """
+    Writes the items of a JSON array that is a value of the root object,
+    laid out as json.dump would with ``indent``.
+    """
+    def __init__(self, out, indent):
+        self.out = out
+        self.indent = indent
+        self.count = 0
+        if indent is None:
+            self.pad = ''
+            self.separator = ', '
+            self.end = ''
+        else:
+            self.pad = '\n' + ' ' * (2 * indent)
+            self.separator = ','
+            self.end = '\n' + ' ' * indent
+
+    def write(self, item):
+        text = json.dumps(item, indent=self.indent)
+        if self.indent is not None:
+            text = text.replace('\n', self.pad)
+        if self.count:
+            self.out.write(self.separator)
+        self.out.write(self.pad + text)
+        self.count += 1
+
+    def closing(self):
+        return (self.end if self.count else '') + ']'
+
+class TreeWriter(object):
+    """
+    Writes a tree whose root holds the fields of ``root`` and a ``key`` list
+    of subtrees, given one by one to write(). ``file`` is a path or an open
+    text file. With ``lines``, each subtree is written as one line and the
+    root's own fields are left out.
+
+    Attributes:
+    count - the number of subtrees written so far
+    """
+    def __init__(self, file, root=None, key='children', indent=None,
+                 lines=False):
+        self.lines = lines
+        self._out, self._owned = _open(file)
+        self._array = None
+        if not lines:
+            document = dict(root or {})
+            document.pop(key, None)
+            document[key] = []
+            self._head, self._tail = _split(
+                json.dumps(document, indent=indent), 1)
+            self._out.write(self._head + '[')
+            self._array = _Array(self._out, indent)
+        self.count = 0
+
+    def write(self, subtree):
+        if self.lines:
+            self._out.write(json.dumps(subtree) + '\n')
+        else:
+            self._array.write(subtree)
+        self.count += 1
+        self._out.flush()
+
+    def close(self):
+        """
+        Ends the document and closes the file if the writer opened it.
+        """
+        if self._array is not None:
+            self._out.write(self._array.closing() + self._tail)
+            self._array = None
+        self._out.flush()
+        if self._owned:
+            self._out.close()
+            self._owned = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class GraphWriter(object):
+    """
+    Writes a {"nodes": [...], "links": [...]} graph from nodes and links
+    given in any order through add_node() and add_link(). Nodes go straight
+    to ``file``; links are spooled, on disk once they outgrow SPOOL_SIZE, and
+    copied after the nodes on close(). With ``lines``, each node and link is
+    written as one line as it comes, tagged with "type": "node" or "link".
+
+    Attributes:
+    nodes - the number of nodes written so far
+    links - the number of links written so far
+    """
+    def __init__(self, file, indent=None, lines=False):
+        self.lines = lines
+        self._out, self._owned = _open(file)
+        self._nodes = self._links = None
+        if not lines:
+            self._head, self._middle, self._tail = _split(
+                json.dumps({'nodes': [], 'links': []}, indent=indent), 2)
+            self._spool = tempfile.SpooledTemporaryFile(SPOOL_SIZE, 'w+')
+            self._out.write(self._head + '[')
+            self._nodes = _Array(self._out, indent)
+            self._links = _Array(self._spool, indent)
+        self.nodes = self.links = 0
+
+    def add_node(self, node):
+        if self.lines:
+            self._out.write(json.dumps(dict(type='node', **node)) + '\n')
+        else:
+            self._nodes.write(node)
+        self.nodes += 1
+        self._out.flush()
+
+    def add_link(self, link):
+        if self.lines:
+            self._out.write(json.dumps(dict(type='link', **link)) + '\n')
+            self._out.flush()
+        else:
+            self._links.write(link)
+        self.links += 1
+
+    def close(self):
+        """
+        Writes the spooled links, ends the document and closes the file if
+        the writer opened it.
+        """
+        if self._nodes is not None:
+            self._out.write(self._nodes.closing() + self._middle + '[')
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, self._out)
+            self._spool.close()
+            self._out.write(self._links.closing() + self._tail)
+            self._nodes = self._links = None
+        self._out.flush()
+        if self._owned:
+            self._out.close()
+            self._owned = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_tree(file, tree, key='children', indent=None, lines=False):
+    """
+    Writes ``tree``, whose ``key`` value may be any iterable of subtrees (a
+    generator, say), with a TreeWriter, and returns how many subtrees were
+    written.
+    """
+    with TreeWriter(file, tree, key, indent, lines) as writer:
+        for subtree in tree.get(key, ()):
+            writer.write(subtree)
+    return writer.count
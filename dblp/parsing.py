@@ -0,0 +1,89 @@
+"""
+Fast parsing of dblp's XML endpoints.
+
+Everything here takes the raw response bytes (``response.content``), so lxml
+decodes once in C according to the XML declaration instead of Python first
+building a str. Author lists are streamed with iterparse and cleared as they
+go, and the per-record lookups are XPath objects compiled once at import.
+"""
+import io
+from collections import Counter, namedtuple
+
+from lxml import etree
+
+RECORD_TAGS = ('article', 'inproceedings', 'proceedings', 'book',
+               'incollection', 'phdthesis', 'mastersthesis', 'www', 'person',
+               'data')
+
+AuthorEntry = namedtuple('AuthorEntry', ['name', 'pid', 'count'])
+
+_JOURNAL = etree.XPath('journal/text()')
+_AUTHOR_PIDS = etree.XPath('author/@pid')
+_AUTHOR_NAMES = etree.XPath('author/text()')
+
+def parse(content):
+    """
+    Returns the root element of the XML document ``content`` (bytes).
+    """
+    return etree.fromstring(content)
+
+def iter_authors(content):
+    """
+    Yields an AuthorEntry (name, pid, count) for every <author> element of
+    ``content``, in document order, eg the hits of an author search or the
+    coauthors of a ?view=coauthor page. pid and count are None when absent.
+    """
+    for _, element in etree.iterparse(io.BytesIO(content), tag='author'):
+        count = element.get('count')
+        yield AuthorEntry((element.text or '').strip(), element.get('pid'),
+                          int(count) if count is not None else None)
+        element.clear(keep_tail=True)
+
+def find_pid(content, name):
+    """
+    Returns the pid of the author named exactly ``name`` in the author search
+    results ``content``, or None.
+    """
+    for author in iter_authors(content):
+        if author.pid and author.name == name:
+            return author.pid
+    return None
+
+def iter_records(content):
+    """
+    Yields the publication record elements (the children of <r>) of a
+    person's XML ``content``, in order. Each element is cleared once the
+    next one is requested, so read what you need before advancing.
+    """
+    for _, element in etree.iterparse(io.BytesIO(content), tag=RECORD_TAGS):
+        parent = element.getparent()
+        if parent is None or parent.tag != 'r':
+            continue
+        yield element
+        element.clear(keep_tail=True)
+        # drop the records already seen so memory stays flat
+        while parent.getprevious() is not None:
+            del parent.getparent()[0]
+
+def record_authors(record):
+    """
+    Returns the author names of a record element.
+    """
+    return _AUTHOR_NAMES(record)
+
+def record_pids(record):
+    """
+    Returns the author pids of a record element.
+    """
+    return _AUTHOR_PIDS(record)
+
+def count_journal_authors(content, journal):
+    """
+    Returns a Counter from author pid to the number of records in ``journal``
+    (eg "Empir. Softw. Eng.") in a person's XML ``content``.
+    """
+    counts = Counter()
+    for record in iter_records(content):
+        if journal in _JOURNAL(record):
+            counts.update(set(_AUTHOR_PIDS(record)))
+    return counts
@@ -0,0 +1,80 @@
+"""
+Ordered concurrent pipeline stages.
+
+A Stage applies a function to a stream of items on a thread pool and yields
+the results in input order, so scripts can resolve, fetch and parse many
+authors at once and still write deterministic output. Stages chain: each one
+consumes the previous one's results as they come out, so later stages start
+work before earlier ones have finished the whole input.
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from dblp import client
+
+DEFAULT_WORKERS = 8
+
+_fetch_executor = None
+_lock = threading.Lock()
+
+class Stage(object):
+    """
+    One step of a pipeline.
+
+    Attributes:
+    func - the function applied to each item
+    workers - how many items are processed at once
+    window - how many items may be submitted ahead of the one being yielded,
+    which bounds memory on long inputs (4 x workers by default)
+    """
+    def __init__(self, func, workers=DEFAULT_WORKERS, window=None):
+        self.func = func
+        self.workers = workers
+        self.window = window or 4 * workers
+
+    def map(self, items):
+        """
+        Yields ``func(item)`` for every item of ``items``, in input order. An
+        exception raised by func is raised here when its item's turn comes.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for item in items:
+                pending.append(executor.submit(self.func, item))
+                if len(pending) >= self.window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+def pipeline(items, *stages):
+    """
+    Runs ``items`` through ``stages`` in turn and returns an iterator over
+    the last stage's results, in input order.
+    """
+    for stage in stages:
+        items = stage.map(items)
+    return items
+
+def _get_fetch_executor():
+    global _fetch_executor
+    with _lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_WORKERS, thread_name_prefix='dblp-fetch')
+        return _fetch_executor
+
+def fetch_all(urls, executor=None):
+    """
+    GETs the URLs in ``urls`` through the shared client on ``executor`` and
+    returns the responses as a list, in order.
+
+    By default every call shares one pool of DEFAULT_WORKERS threads, so
+    calling fetch_all from many threads at once (from a crawl's workers,
+    say) neither starts a pool per call nor sends more than DEFAULT_WORKERS
+    requests at a time. The pool only runs client.get, which never waits on
+    it in turn.
+    """
+    executor = executor if executor is not None else _get_fetch_executor()
+    futures = [executor.submit(client.get, url) for url in urls]
+    return [future.result() for future in futures]
@@ -0,0 +1,63 @@
+"""
+Parsing of dblp's HTML person pages.
+
+A profile lists publications as <li> entries (class "entry" on current pages,
+"publ" on older ones), grouped under <li class="year"> headers. The parser
+walks the list once, in document order, and only searches inside the entry
+at hand, so it is linear in the size of the page.
+"""
+from collections import namedtuple
+
+from lxml import html
+
+ProfileEntry = namedtuple('ProfileEntry', ['title', 'year', 'coauthors',
+                                           'venue'])
+
+def _classes(element):
+    return element.get('class', '').split()
+
+def _text(element):
+    return element.text_content().strip() if element is not None else None
+
+def _year(text):
+    text = (text or '').strip()
+    return int(text) if text.isdigit() else None
+
+def _parse_entry(entry, year, owner):
+    title = entry.find('.//span[@class="title"]')
+    if title is None:
+        title = entry.find('.//span[@itemprop="headline"]')
+    title = _text(title)
+    if title and title.endswith('.'):
+        title = title[:-1]
+
+    published = entry.find('.//span[@itemprop="datePublished"]')
+    if published is None:
+        published = entry.find('.//span[@class="year"]')
+    year = _year(_text(published)) or year
+
+    coauthors = []
+    for author in entry.iterfind('.//span[@itemprop="author"]'):
+        name = author.find('.//span[@itemprop="name"]')
+        name = _text(name if name is not None else author)
+        if name and name != owner:
+            coauthors.append(name)
+
+    venue = entry.find('.//span[@itemprop="isPartOf"]//span[@itemprop="name"]')
+    return ProfileEntry(title, year, coauthors, _text(venue))
+
+def iter_profile(content, owner=None):
+    """
+    Yields a ProfileEntry (title, year, coauthors, venue) for every
+    publication on the person page ``content`` (bytes or str), in page order.
+    ``coauthors`` lists the entry's author names, less ``owner`` if given.
+    Entries without a year of their own take the one of their year header.
+    """
+    root = html.fromstring(content)
+    year = None
+    for li in root.iter('li'):
+        classes = _classes(li)
+        if 'year' in classes:
+            year = _year(li.text_content())
+        elif 'entry' in classes or 'publ' in classes:
+            yield _parse_entry(li, year, owner)
@@ -0,0 +1,198 @@
+"""
+Client-side rate limiting for requests to dblp.
+
+A RateLimiter is a token bucket: tokens refill at ``rate`` per second up to
+``burst`` and every request takes one, waiting when the bucket is empty. When
+dblp answers 429 or 503 the limiter is told via throttled(): every user of it
+pauses until the server's Retry-After has passed (or an exponential backoff
+with jitter, if there is none), and the rate is halved. Each success then
+wins back a little of it, so the limiter settles just under what dblp
+accepts.
+
+Threads share a limiter object. Processes share one by giving the same
+``path``: the bucket then lives in that file and every update happens under
+an exclusive fcntl lock on it (POSIX only).
+"""
+import email.utils
+import os
+import random
+import struct
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 60.0
+
+LimiterStats = namedtuple('LimiterStats', ['requests', 'throttled', 'waited'])
+
+# tokens, last refill, paused until, current rate
+_STATE = struct.Struct('4d')
+
+def backoff(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """
+    Returns a delay for retry number ``attempt`` (from 0): exponential in the
+    attempt, capped, with full jitter.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_after(response):
+    """
+    Returns the delay in seconds asked for by ``response``'s Retry-After
+    header (in seconds or as an HTTP date), or None.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+class RateLimiter(object):
+    """
+    A token bucket with adaptive backoff, shared by threads and, through the
+    file at ``path``, by processes.
+
+    Attributes:
+    max_rate - the configured requests per second, which the rate recovers to
+    min_rate - the floor the rate is never halved below
+    burst - the bucket size, ie how many requests may go out back to back
+    path - the shared state file, or None for a per-process limiter
+    stats - a (requests, throttled, waited) named tuple for this process;
+    waited is the total time its requests spent waiting, summed over threads
+    """
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, path=None,
+                 min_rate=None, clock=time.time, sleep=time.sleep):
+        if path is not None and fcntl is None:
+            raise ValueError('sharing a RateLimiter needs fcntl (POSIX)')
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate or rate / 16.0)
+        self.burst = float(burst)
+        self.path = path
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._state = (self.burst, clock(), 0.0, self.max_rate)
+        self._fd = None
+        if path is not None:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._requests = self._throttled = 0
+        self._waited = 0.0
+
+    def _update(self, change):
+        """
+        Applies ``change(tokens, paused_until, rate, now)`` to the refilled
+        bucket and stores the state it returns along with a result, which is
+        passed back.
+        """
+        with self._lock:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                state = self._state
+                if self._fd is not None:
+                    raw = os.pread(self._fd, _STATE.size, 0)
+                    if len(raw) == _STATE.size:
+                        state = _STATE.unpack(raw)
+                tokens, updated, paused_until, rate = state
+                now = self.clock()
+                tokens = min(self.burst,
+                             tokens + max(now - updated, 0.0) * rate)
+                state, result = change(tokens, paused_until, rate, now)
+                self._state = state
+                if self._fd is not None:
+                    os.pwrite(self._fd, _STATE.pack(*state), 0)
+                return result
+            finally:
+                if self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent and takes its token. Returns the
+        time spent waiting.
+        """
+        def take(tokens, paused_until, rate, now):
+            if now < paused_until:
+                wait = paused_until - now
+            elif tokens >= 1:
+                return (tokens - 1, now, paused_until, rate), 0.0
+            else:
+                wait = (1 - tokens) / rate
+            return (tokens, now, paused_until, rate), wait
+
+        waited = 0.0
+        while True:
+            wait = self._update(take)
+            if not wait:
+                break
+            self.sleep(wait)
+            waited += wait
+        with self._lock:
+            self._requests += 1
+            self._waited += waited
+        return waited
+
+    def throttled(self, delay=None, attempt=0):
+        """
+        Records that the server throttled a request: pauses every user of the
+        limiter for ``delay`` seconds (the Retry-After), or a jittered
+        exponential backoff for retry ``attempt``, and halves the rate.
+        Returns the pause.
+        """
+        if delay is None:
+            delay = backoff(attempt)
+        else:
+            # spread out the clients that were all told the same time
+            delay += random.uniform(0, BACKOFF_BASE)
+
+        def pause(tokens, paused_until, rate, now):
+            return (0.0, now, max(paused_until, now + delay),
+                    max(self.min_rate, rate / 2.0)), delay
+
+        with self._lock:
+            self._throttled += 1
+        return self._update(pause)
+
+    def succeeded(self):
+        """
+        Records a request the server accepted, recovering the rate a step
+        towards max_rate.
+        """
+        step = self.max_rate / 20.0
+
+        def recover(tokens, paused_until, rate, now):
+            return (tokens, now, paused_until,
+                    min(self.max_rate, rate + step)), None
+
+        self._update(recover)
+
+    @property
+    def rate(self):
+        """
+        The current, adapted requests per second.
+        """
+        return self._update(lambda tokens, paused_until, rate, now:
+                            ((tokens, now, paused_until, rate), rate))
+
+    @property
+    def stats(self):
+        with self._lock:
+            return LimiterStats(self._requests, self._throttled, self._waited)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,222 @@
+"""
+Incremental recrawls, driven by the mdates of each author's records.
+
+Every dblp record carries an mdate, the day it was last modified, so an
+author's profile has changed exactly when the set of (key, mdate) pairs in
+their person XML has. A Recrawler wraps a crawl's expand function and keeps,
+per author, that record set, the HTTP validators (ETag, Last-Modified) of the
+person XML and the entries expand returned. On the next run it asks dblp for
+the person XML conditionally; when the answer is 304 Not Modified, or the
+record set is unchanged, the stored entries are returned without calling
+expand, so the coauthor views and the parsing behind them are skipped::
+
+    recrawler = Recrawler("dblp_recrawl.sqlite", "ese_coauthors",
+                          get_ese_coauthors)
+    result = crawl(seeds, recrawler.expand, depth=2, fanout=5)
+    print(recrawler.stats)  # how many authors changed
+
+The outputs are then rebuilt from the stored entries, which takes
+milliseconds; only changed authors cost any real requests. Entries are
+stored under a namespace naming the expand function, so crawls with
+different expand functions can share one file without reading each other's
+entries; give a new namespace when an expand function changes what it
+returns.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import dblp
+from dblp import client, parsing
+
+RecrawlStats = namedtuple('RecrawlStats', ['checked', 'unchanged', 'changed'])
+
+RecordDiff = namedtuple('RecordDiff', ['added', 'removed', 'modified'])
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS authors (
+    namespace TEXT NOT NULL,
+    pid TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    entries TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (namespace, pid)
+);
+CREATE TABLE IF NOT EXISTS records (
+    namespace TEXT NOT NULL,
+    pid TEXT NOT NULL,
+    key TEXT NOT NULL,
+    mdate TEXT,
+    PRIMARY KEY (namespace, pid, key)
+);
+'''
+
+def record_mdates(content):
+    """
+    Returns {key: mdate} for the records in a person's XML ``content``.
+    """
+    return dict((record.get('key'), record.get('mdate'))
+                for record in parsing.iter_records(content))
+
+def diff_records(old, new):
+    """
+    Returns the RecordDiff between two {key: mdate} dicts: the keys added,
+    removed and given a new mdate, each as a sorted list.
+    """
+    return RecordDiff(sorted(set(new) - set(old)), sorted(set(old) - set(new)),
+                      sorted(key for key in set(old) & set(new)
+                             if old[key] != new[key]))
+
+class Recrawler(object):
+    """
+    Remembers what a crawl saw of each author, in SQLite, and only expands
+    authors again once their records have changed. Safe to share between
+    threads.
+
+    Attributes:
+    path - the SQLite database file, or None to keep the state in memory
+    namespace - the name the entries of ``expand`` are stored under, eg
+    "ese_coauthors"; a Recrawler only sees its own namespace's entries
+    url - the person XML URL, a format string with a {pid} field; give the
+    one expand itself fetches, so both share the response cache. It is
+    always revalidated with dblp, so a fresh cache entry can't hide a change
+    changes - {pid: RecordDiff} for the authors found changed in this run;
+    authors not seen before have every record under ``added``
+    stats - a (checked, unchanged, changed) named tuple of counts for this run
+    """
+    def __init__(self, path, namespace, expand, url=dblp.DBLP_PID_URL):
+        if not namespace:
+            raise ValueError('a Recrawler needs a namespace')
+        self.path = path
+        self.namespace = namespace
+        self.url = url
+        self._expand = expand
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ':memory:', timeout=30,
+                                   check_same_thread=False)
+        if path is not None:
+            self._db.execute('PRAGMA journal_mode=WAL')
+        with self._db:
+            version = self._db.execute('PRAGMA user_version').fetchone()[0]
+            if version < SCHEMA_VERSION:
+                # the old tables weren't namespaced; start over
+                self._db.execute('DROP TABLE IF EXISTS authors')
+                self._db.execute('DROP TABLE IF EXISTS records')
+                self._db.execute('PRAGMA user_version = {}'.format(
+                    SCHEMA_VERSION))
+        self._db.executescript(_SCHEMA)
+        self.changes = {}
+        self._unchanged = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            changed = len(self.changes)
+            return RecrawlStats(self._unchanged + changed, self._unchanged,
+                                changed)
+
+    def _load(self, pid):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, entries FROM authors '
+                'WHERE namespace = ? AND pid = ?',
+                (self.namespace, pid)).fetchone()
+            if row is None:
+                return None, None, {}
+            mdates = dict(self._db.execute(
+                'SELECT key, mdate FROM records '
+                'WHERE namespace = ? AND pid = ?', (self.namespace, pid)))
+        etag, last_modified, entries = row
+        return (etag, last_modified), json.loads(entries), mdates
+
+    def _save(self, pid, response, entries, mdates):
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO authors VALUES (?, ?, ?, ?, ?, ?)',
+                    (self.namespace, pid, response.headers.get('ETag'),
+                     response.headers.get('Last-Modified'),
+                     json.dumps(entries), time.time()))
+                self._db.execute(
+                    'DELETE FROM records WHERE namespace = ? AND pid = ?',
+                    (self.namespace, pid))
+                self._db.executemany(
+                    'INSERT INTO records VALUES (?, ?, ?, ?)',
+                    [(self.namespace, pid, key, mdate)
+                     for key, mdate in mdates.items()])
+
+    def _touch(self, pid):
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    'UPDATE authors SET checked_at = ? '
+                    'WHERE namespace = ? AND pid = ?',
+                    (time.time(), self.namespace, pid))
+
+    def expand(self, pid):
+        """
+        Returns the stored entries for ``pid`` if its records haven't changed
+        since they were stored, and otherwise calls the wrapped expand and
+        stores what it returns. None results (failed fetches) aren't stored,
+        so those authors are tried again next time.
+        """
+        validators, entries, mdates = self._load(pid)
+        headers = {}
+        if validators is not None:
+            etag, last_modified = validators
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        # a fresh cache entry could hide a change for the cache's whole TTL
+        response = client.get(self.url.format(pid=pid), headers=headers,
+                              revalidate=True)
+
+        if response.status_code == 304 and validators is not None:
+            new_mdates = mdates
+        elif response.status_code == 200:
+            new_mdates = record_mdates(response.content)
+        else:
+            # can't tell; expand reports the failure its own way
+            return self._expand(pid)
+
+        if validators is not None and new_mdates == mdates:
+            if response.status_code == 200:
+                # keep the new validators, or every later check is a 200 too
+                self._save(pid, response, entries, mdates)
+            else:
+                self._touch(pid)
+            with self._lock:
+                self._unchanged += 1
+            return entries
+
+        entries = self._expand(pid)
+        if entries is not None:
+            self._save(pid, response, entries, new_mdates)
+        with self._lock:
+            self.changes[pid] = diff_records(mdates, new_mdates)
+        return entries
+
+    def forget(self, pid=None):
+        """
+        Drops what this namespace stores for ``pid``, or for every author if
+        None, so it is expanded afresh on the next run.
+        """
+        where = 'WHERE namespace = ?'
+        args = (self.namespace,)
+        if pid is not None:
+            where += ' AND pid = ?'
+            args += (pid,)
+        with self._lock:
+            with self._db:
+                self._db.execute('DELETE FROM authors ' + where, args)
+                self._db.execute('DELETE FROM records ' + where, args)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
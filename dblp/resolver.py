@@ -0,0 +1,207 @@
+"""
+Resolving author names to dblp PIDs, in batches, with a persistent store.
+
+Scripts start from display names such as "Xin Xia 0001 (22)" and need PIDs
+for every URL they build. A PidResolver normalises each name (the trailing
+"(22)" publication count is dropped and whitespace collapsed), looks it up
+in its SQLite store under a folded key (accents stripped, case folded) and
+only searches dblp for the names it hasn't seen, concurrently::
+
+    resolver = PidResolver("dblp_pids.sqlite")
+    pids = resolver.resolve_all(names)  # in the order of names
+
+Mappings are kept for ``ttl`` seconds, and names dblp doesn't know for the
+shorter ``miss_ttl``; ``invalidate`` forgets a name (or every name) early,
+eg after dblp has split a homonym.
+"""
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+
+import requests
+
+import dblp
+from dblp import client, parsing
+from dblp.pipeline import DEFAULT_WORKERS, Stage
+
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MISS_TTL = 24 * 60 * 60
+
+ResolverStats = namedtuple('ResolverStats', ['hits', 'misses'])
+
+_COUNT = re.compile(r'\(\d+\)')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pids (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    pid TEXT,
+    expires_at REAL NOT NULL
+);
+'''
+
+def normalize(name):
+    """
+    Returns the display name ``name`` without publication counts such as
+    "(68)" and with its whitespace collapsed, eg "David Lo 0001 (35)" ->
+    "David Lo 0001".
+    """
+    return ' '.join(_COUNT.sub(' ', name).split())
+
+def fold(name):
+    """
+    Returns the key ``name`` is stored under: normalised, decomposed with
+    NFKD, combining marks dropped and case folded, so "Yann-Gaël Guéheneuc"
+    and "yann-gael gueheneuc" are the same author.
+    """
+    decomposed = unicodedata.normalize('NFKD', normalize(name))
+    return ''.join(c for c in decomposed
+                   if not unicodedata.combining(c)).casefold()
+
+def search(name):
+    """
+    Searches dblp for the author called ``name`` (already normalised) and
+    returns their PID, or None. A hit named exactly ``name`` wins over one
+    that only matches after folding. Only a 200 answers the question; any
+    other status (eg a 429 left over once the client stops retrying) raises
+    requests.HTTPError, so it isn't stored as a miss.
+    """
+    response = client.get(dblp.DBLP_AUTHOR_SEARCH_URL,
+                          params={'xauthor': name})
+    if response.status_code != 200:
+        response.raise_for_status()
+        raise requests.HTTPError('{} from the author search for {!r}'.format(
+            response.status_code, name), response=response)
+    pid = parsing.find_pid(response.content, name)
+    if pid:
+        return pid
+    key = fold(name)
+    for author in parsing.iter_authors(response.content):
+        if author.pid and fold(author.name) == key:
+            return author.pid
+    return None
+
+class PidResolver(object):
+    """
+    A name -> PID mapping backed by SQLite, filled in from dblp on demand.
+    Safe to share between threads, and between processes pointing at the
+    same file.
+
+    Attributes:
+    path - the SQLite database file, or None to keep the mapping in memory
+    ttl - seconds a resolved PID is trusted
+    miss_ttl - seconds a name dblp didn't know is remembered as unknown
+    workers - how many names are searched for at once
+    stats - a (hits, misses) named tuple of names answered from the store
+    and names searched for, since this object was created
+    """
+    def __init__(self, path=None, ttl=DEFAULT_TTL, miss_ttl=DEFAULT_MISS_TTL,
+                 workers=DEFAULT_WORKERS, search=search):
+        self.path = path
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.workers = workers
+        self.search = search
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ':memory:', timeout=30,
+                                   check_same_thread=False)
+        if path is not None:
+            self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._hits = self._misses = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            return ResolverStats(self._hits, self._misses)
+
+    def resolve(self, name):
+        """
+        Returns the PID of the author called ``name``, or None if dblp has no
+        author by that name.
+        """
+        return self.resolve_all([name])[0]
+
+    def resolve_all(self, names):
+        """
+        Returns the PIDs of ``names`` as a list in the same order, with None
+        for the names dblp doesn't know. Names already in the store are
+        answered from it; the rest are searched for concurrently, each
+        distinct one once, and stored. If a search fails, the answers that
+        did come back are stored and the first error is raised.
+        """
+        names = list(names)
+        keys = [fold(name) for name in names]
+        pids = self._lookup(set(keys))
+        missing = {}
+        for name, key in zip(names, keys):
+            if key not in pids:
+                missing.setdefault(key, normalize(name))
+        if missing:
+            results = list(zip(missing, Stage(self._attempt, self.workers)
+                               .map(missing.values())))
+            found = [(key, pid) for key, (pid, error) in results
+                     if error is None]
+            self._store(missing, found)
+            errors = [error for _, (_, error) in results if error is not None]
+            if errors:
+                raise errors[0]
+            pids.update(found)
+        with self._lock:
+            self._hits += len(keys) - len(missing)
+            self._misses += len(missing)
+        return [pids[key] for key in keys]
+
+    def _attempt(self, name):
+        try:
+            return self.search(name), None
+        except requests.RequestException as error:
+            return None, error
+
+    def _lookup(self, keys):
+        """
+        Returns {key: pid} for the unexpired entries among ``keys``.
+        """
+        keys = list(keys)
+        now = time.time()
+        found = {}
+        with self._lock:
+            # stay under SQLite's limit on bound parameters
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    'SELECT key, pid FROM pids WHERE expires_at > ? AND key '
+                    'IN ({})'.format(', '.join('?' * len(chunk))),
+                    [now] + chunk)
+                found.update(rows)
+        return found
+
+    def _store(self, names, found):
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO pids VALUES (?, ?, ?, ?)',
+                    [(key, names[key], pid,
+                      now + (self.ttl if pid else self.miss_ttl))
+                     for key, pid in found])
+
+    def invalidate(self, name=None):
+        """
+        Forgets the PID stored for ``name``, or for every name if None, so it
+        is searched for again.
+        """
+        with self._lock:
+            with self._db:
+                if name is None:
+                    self._db.execute('DELETE FROM pids')
+                else:
+                    self._db.execute('DELETE FROM pids WHERE key = ?',
+                                     (fold(name),))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,382 @@
+"""
+A compact, columnar on-disk store of dblp records.
+
+Each record is one row spread over fixed-width column files (years, venue
+ids, types, mdates) plus a CSR pair of author-id arrays, and titles, keys and
+names live in string heaps. Every file is memory-mapped on open, so a store
+of millions of records is queried without materialising a Python object per
+record. Build one from the dump with::
+
+    python -m dblp.store dblp.xml.gz dblp-store/
+
+Author ids index the ``names`` heap, which is sorted so names can be looked
+up by binary search; ``name_pids`` holds the pid of each name where the dump
+has a person record for it. Columns use the machine's native byte order.
+"""
+import json
+import mmap
+import os
+import sys
+from array import array
+
+import dblp
+from dblp.dump import PERSON_KEY_PREFIX, RECORD_TAGS, iter_records
+
+FORMAT_VERSION = 1
+
+NO_YEAR = 0
+NO_VENUE = -1
+
+class _Heap(object):
+    """
+    A read-only sequence of strings stored as an offsets column plus one
+    UTF-8 blob.
+    """
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return max(len(self.offsets) - 1, 0)
+
+    def raw(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i):
+        return bytes(self.raw(i)).decode('utf-8')
+
+    def bisect(self, value, order=None):
+        """
+        Returns the index of ``value`` in a heap sorted by its UTF-8 bytes, or
+        in the order given by the ``order`` permutation, or None.
+        """
+        target = value.encode('utf-8')
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = mid if order is None else order[mid]
+            if bytes(self.raw(i)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self):
+            i = lo if order is None else order[lo]
+            if bytes(self.raw(i)) == target:
+                return i
+        return None
+
+class _HeapWriter(object):
+    def __init__(self, path):
+        self.file = open(path + '.dat', 'wb')
+        self.path = path
+        self.offsets = array('Q', [0])
+
+    def append(self, value):
+        data = (value or '').encode('utf-8')
+        self.file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def close(self):
+        self.file.close()
+        _write_column(self.path + '.off', self.offsets)
+
+def _write_column(path, column):
+    with open(path, 'wb') as f:
+        column.tofile(f)
+
+def _parse_mdate(mdate):
+    try:
+        return int(mdate.replace('-', ''))
+    except (AttributeError, ValueError):
+        return 0
+
+def _format_mdate(value):
+    if not value:
+        return None
+    value = str(value)
+    return '{}-{}-{}'.format(value[:4], value[4:6], value[6:])
+
+class StoreBuilder(object):
+    """
+    Writes a RecordStore into ``directory`` one record at a time. Call
+    close() to finish the store.
+    """
+    def __init__(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.years = array('H')
+        self.venues = array('i')
+        self.types = array('B')
+        self.mdates = array('I')
+        self.author_offsets = array('I', [0])
+        self.author_ids = array('I')
+        self.keys = []
+        self.titles = _HeapWriter(self._path('titles'))
+        self.names = {}
+        self.venue_names = {}
+        self.pids = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _intern(self, table, value):
+        ident = table.get(value)
+        if ident is None:
+            ident = table[value] = len(table)
+        return ident
+
+    def add_person(self, pid, names):
+        """
+        Records that every name in ``names`` belongs to the person ``pid``.
+        """
+        for name in names:
+            self.pids[name] = pid
+
+    def add(self, key, type, mdate, title, year, venue, authors):
+        """
+        Appends one record. ``year`` may be None, ``venue`` is the journal or
+        booktitle and ``authors`` a list of names.
+        """
+        self.keys.append(key)
+        self.types.append(RECORD_TAGS.index(type))
+        self.mdates.append(_parse_mdate(mdate))
+        self.titles.append(title)
+        self.years.append(year or NO_YEAR)
+        self.venues.append(NO_VENUE if venue is None else
+                           self._intern(self.venue_names, venue))
+        self.author_ids.extend(self._intern(self.names, n) for n in authors)
+        self.author_offsets.append(len(self.author_ids))
+
+    def add_element(self, element):
+        """
+        Appends a record element from the dump, or records the person if it
+        is a person (homepages/) record.
+        """
+        key = element.get('key')
+        authors = [a.text for a in element.iterfind('author') if a.text]
+        if element.tag == 'www' and key.startswith(PERSON_KEY_PREFIX):
+            self.add_person(key[len(PERSON_KEY_PREFIX):], authors)
+            return
+        year = element.findtext('year')
+        self.add(key, element.tag, element.get('mdate'),
+                 element.findtext('title'),
+                 int(year) if year and year.isdigit() else None,
+                 element.findtext('journal') or element.findtext('booktitle'),
+                 authors)
+
+    def close(self):
+        self.titles.close()
+        # renumber authors so ids follow the sorted names heap
+        names = sorted(self.names, key=lambda n: n.encode('utf-8'))
+        remap = array('I', bytes(4 * len(names)))
+        heap, pids = _HeapWriter(self._path('names')), \
+            _HeapWriter(self._path('name_pids'))
+        for ident, name in enumerate(names):
+            remap[self.names[name]] = ident
+            heap.append(name)
+            pids.append(self.pids.get(name))
+        heap.close()
+        pids.close()
+        self.author_ids = array('I', (remap[i] for i in self.author_ids))
+
+        keys = _HeapWriter(self._path('keys'))
+        for key in self.keys:
+            keys.append(key)
+        keys.close()
+        order = sorted(range(len(self.keys)),
+                       key=lambda r: self.keys[r].encode('utf-8'))
+        _write_column(self._path('key_order.I'), array('I', order))
+
+        venues = _HeapWriter(self._path('venue_names'))
+        for venue in sorted(self.venue_names, key=self.venue_names.get):
+            venues.append(venue)
+        venues.close()
+
+        for name, column in [('years.H', self.years), ('venues.i', self.venues),
+                             ('types.B', self.types), ('mdates.I', self.mdates),
+                             ('author_offsets.I', self.author_offsets),
+                             ('author_ids.I', self.author_ids)]:
+            _write_column(self._path(name), column)
+        with open(self._path('meta.json'), 'w') as f:
+            json.dump({'version': FORMAT_VERSION, 'records': len(self.keys),
+                       'names': len(names), 'venues': len(self.venue_names)},
+                      f)
+
+def build_store(dump_path, directory):
+    """
+    Builds a RecordStore in ``directory`` from the dump at ``dump_path`` in
+    one streaming pass and returns it.
+    """
+    builder = StoreBuilder(directory)
+    for element in iter_records(dump_path):
+        builder.add_element(element)
+    builder.close()
+    return RecordStore(directory)
+
+class RecordStore(object):
+    """
+    A memory-mapped, read-only view of a store written by StoreBuilder. Rows
+    are numbered from 0 in dump order.
+
+    Attributes:
+    years - the year of each row (array of uint16, 0 if unknown)
+    venues - the venue id of each row (array of int32, -1 if none)
+    types - the index into RECORD_TAGS of each row's type
+    mdates - each row's mdate as a YYYYMMDD integer
+    author_offsets, author_ids - row i's author ids are
+    author_ids[author_offsets[i]:author_offsets[i + 1]]
+    keys, titles, names, name_pids, venue_names - string heaps
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._maps = []
+        with open(self._path('meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != FORMAT_VERSION:
+            raise ValueError('unsupported store version {}'.format(
+                self.meta['version']))
+        self.years = self.map_column('years.H', 'H')
+        self.venues = self.map_column('venues.i', 'i')
+        self.types = self.map_column('types.B', 'B')
+        self.mdates = self.map_column('mdates.I', 'I')
+        self.author_offsets = self.map_column('author_offsets.I', 'I')
+        self.author_ids = self.map_column('author_ids.I', 'I')
+        self.key_order = self.map_column('key_order.I', 'I')
+        self.keys = self._heap('keys')
+        self.titles = self._heap('titles')
+        self.names = self._heap('names')
+        self.name_pids = self._heap('name_pids')
+        self.venue_names = self._heap('venue_names')
+        self._venue_ids = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def map_column(self, name, typecode):
+        """
+        Memory-maps the column file ``name`` of this store - one of its own or
+        one written alongside it, such as an index - as an array of
+        ``typecode``. The mapping is released by close().
+        """
+        with open(self._path(name), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(array(typecode))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        column = memoryview(mapped).cast(typecode)
+        self._maps.append((column, mapped))
+        return column
+
+    def _heap(self, name):
+        return _Heap(self.map_column(name + '.off', 'Q'),
+                     self.map_column(name + '.dat', 'B'))
+
+    def __len__(self):
+        return self.meta['records']
+
+    def row(self, key):
+        """
+        Returns the row of the record with ``key``, or None.
+        """
+        return self.keys.bisect(key, order=self.key_order)
+
+    def authors(self, row):
+        """
+        Returns the author ids of ``row``.
+        """
+        return self.author_ids[self.author_offsets[row]:
+                               self.author_offsets[row + 1]].tolist()
+
+    def author_id(self, name):
+        """
+        Returns the author id of ``name``, or None.
+        """
+        return self.names.bisect(name)
+
+    def venue_id(self, venue):
+        """
+        Returns the venue id of the journal or booktitle ``venue``, or None.
+        """
+        if self._venue_ids is None:
+            self._venue_ids = dict((self.venue_names[i], i)
+                                   for i in range(len(self.venue_names)))
+        return self._venue_ids.get(venue)
+
+    def venue(self, row):
+        venue = self.venues[row]
+        return None if venue == NO_VENUE else self.venue_names[venue]
+
+    def publication(self, row):
+        """
+        Returns a StoredPublication view over ``row``.
+        """
+        return StoredPublication(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield StoredPublication(self, row)
+
+    def close(self):
+        for column, mapped in self._maps:
+            column.release()
+            mapped.close()
+        self._maps = []
+
+def _decode_year(store, row):
+    year = store.years[row]
+    return None if year == NO_YEAR else year
+
+def _decode_venue_for(tag):
+    def decode(store, row):
+        if (RECORD_TAGS[store.types[row]] == 'article') == (tag == 'journal'):
+            return store.venue(row)
+        return None
+    return decode
+
+class StoredPublication(dblp.Publication):
+    """
+    A Publication backed by one row of a RecordStore. Fields are decoded from
+    the columns on access; fields the store doesn't keep are None.
+    """
+    columns = {
+        'key': lambda store, row: store.keys[row],
+        'type': lambda store, row: RECORD_TAGS[store.types[row]],
+        'mdate': lambda store, row: _format_mdate(store.mdates[row]),
+        'title': lambda store, row: store.titles[row] or None,
+        'year': _decode_year,
+        'journal': _decode_venue_for('journal'),
+        'booktitle': _decode_venue_for('booktitle'),
+        'authors': lambda store, row: [store.names[i]
+                                       for i in store.authors(row)],
+    }
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def data(self):
+        data = dict.fromkeys(dblp.Publication.fields)
+        data.update((k, getattr(self, k)) for k in self.columns if k != 'key')
+        return data
+
+    def __getattr__(self, key):
+        decode = self.columns.get(key)
+        if decode is not None:
+            return decode(self.store, self.row)
+        if key == 'xml':
+            return None
+        if key in dblp.Publication.fields:
+            return None
+        raise AttributeError(key)
+
+    def load_data(self):
+        pass
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m dblp.store DUMP.xml.gz STORE_DIR')
+    print('stored {} records'.format(len(build_store(sys.argv[1],
+                                                     sys.argv[2]))))
@@ -0,0 +1,89 @@
+"""
+Harvesting the publications and authors of a venue.
+
+Publications come from dblp's paginated publication search API, one query per
+year so the year bound is exact, or from a local RecordStore. Either way
+results are streamed: each page is parsed and yielded as it arrives, and
+the harvest stops at the year bound.
+"""
+import datetime
+
+import dblp
+
+DBLP_PUBLICATION_SEARCH_URL = dblp.DBLP_BASE_URL + 'search/publ/api'
+
+MAX_PAGE_SIZE = dblp.API_MAX_PAGE_SIZE
+
+def _parse_hit(info):
+    year = info.findtext('year')
+    return {
+        'key': info.findtext('key'),
+        'title': info.findtext('title'),
+        'venue': info.findtext('venue'),
+        'year': int(year) if year and year.isdigit() else None,
+        'authors': [(a.text, a.get('pid'))
+                    for a in info.iterfind('authors/author')],
+    }
+
+def _search_year(venue, year, page_size):
+    for info in dblp.iter_api_hits(DBLP_PUBLICATION_SEARCH_URL,
+                                   'venue:{}: year:{}:'.format(venue, year),
+                                   page_size):
+        yield _parse_hit(info)
+
+def _store_publications(store, venue, since_year, until_year):
+    venue_id = store.venue_id(venue)
+    if venue_id is None:
+        return
+    venues, years = store.venues, store.years
+    for row in range(len(store)):
+        if venues[row] == venue_id and \
+                since_year <= years[row] <= until_year:
+            yield {
+                'key': store.keys[row],
+                'title': store.titles[row],
+                'venue': venue,
+                'year': years[row],
+                'authors': [(store.names[i], store.name_pids[i] or None)
+                            for i in store.authors(row)],
+            }
+
+def iter_venue_publications(venue, since_year, until_year=None,
+                            page_size=MAX_PAGE_SIZE, store=None):
+    """
+    Yields the publications of ``venue`` (eg "ICSE") from ``since_year`` to
+    ``until_year`` inclusive, newest year first, as dicts with key, title,
+    venue, year and authors, a list of (name, pid) pairs.
+
+    With a RecordStore as ``store``, rows whose journal or booktitle is
+    exactly ``venue`` are read from it instead of the search API, in store
+    order. ``until_year`` defaults to the current year.
+    """
+    if store is not None:
+        for publication in _store_publications(store, venue, since_year,
+                                               until_year or 9999):
+            yield publication
+        return
+    if until_year is None:
+        until_year = datetime.date.today().year
+    for year in range(until_year, since_year - 1, -1):
+        for publication in _search_year(venue, year, page_size):
+            # the year facet is a prefix match, so double check
+            if publication['year'] == year:
+                yield publication
+
+def iter_venue_authors(venue, since_year, until_year=None,
+                       page_size=MAX_PAGE_SIZE, store=None):
+    """
+    Yields each distinct (name, pid) author of ``venue`` between the two years
+    once, as soon as the page introducing them has been parsed. Authors
+    without a pid are told apart by name.
+    """
+    seen = set()
+    for publication in iter_venue_publications(venue, since_year, until_year,
+                                               page_size, store):
+        for name, pid in publication['authors']:
+            ident = pid or name
+            if ident not in seen:
+                seen.add(ident)
+                yield name, pid
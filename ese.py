@@ -1,9 +1,12 @@
-import json
-import re
-from xml.dom import minidom
-import requests
-from bs4 import BeautifulSoup
-
+from dblp import client, parsing
+from dblp.cache import ResponseCache
+from dblp.crawl import crawl
+from dblp.mirrors import HostPool
+from dblp.output import TreeWriter
+from dblp.pipeline import fetch_all
+from dblp.ratelimit import RateLimiter
+from dblp.recrawl import Recrawler
+from dblp.resolver import PidResolver
 
 # Function to preprocess author name
 def preprocess_author_name(name):
@@ -11,114 +14,59 @@ def preprocess_author_name(name):
     return name
 
 
-# Function to get author's pid
-def get_pid(name):
-    # Remove numbers and parentheses from the author name
-    author_name = re.sub(r"\(\d+\)", "", name).strip()
-    url = "https://dblp.uni-trier.de/search/author?xauthor=" + author_name
-    response = requests.get(url)
-
-    xmldoc = minidom.parseString(response.content)
-    author_elements = xmldoc.getElementsByTagName("author")
-
-    for item in author_elements:
-        item_name = item.firstChild.nodeValue.strip()
-        if item.hasAttribute("pid") and item_name == author_name:
-            return item.attributes["pid"].value
-
-    return None
-
-
-# Function to retrieve top 5 coauthors within ESE for an author using their PID
-def get_top_coauthors(pid):
+# Function to rank an author's coauthors by their ESE collaborations
+def get_ese_coauthors(pid):
     url = f"https://dblp.uni-trier.de/pid/{pid}.xml?view=coauthor"
+    author_url = f"https://dblp.uni-trier.de/pid/{pid}.xml"
 
-    response = requests.get(url)
+    # Fetch the coauthor view and the publication records at the same time
+    response, author_response = fetch_all([url, author_url])
     if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "lxml")
         coauthors = []
-        author_elements = soup.find_all("author")
 
-        for author_element in author_elements:
-            coauthor_name = preprocess_author_name(author_element.text)
-            coauthor_pid = author_element.get("pid")
+        for author in parsing.iter_authors(response.content):
+            coauthor_name = preprocess_author_name(author.name)
+            coauthor_pid = author.pid
             coauthors.append({"name": coauthor_name, "pid": coauthor_pid, "count": 0})
 
-        # Fetch ESE publications for the main author
-        author_url = f"https://dblp.uni-trier.de/pid/{pid}.xml"
-        author_response = requests.get(author_url)
+        # Count ESE publications for the main author
         if author_response.status_code == 200:
-            author_soup = BeautifulSoup(author_response.text, "lxml")
-            articles = author_soup.find_all("r")
-
-            for article in articles:
-                article_authors = article.find_all("author")
-                ese_publication = article.find("journal", text="Empir. Softw. Eng.")
-                if ese_publication:
-                    for coauthor in coauthors:
-                        if any(
-                            coauthor["pid"] in author.get("pid")
-                            for author in article_authors
-                        ):
-                            coauthor["count"] += 1
+            # ESE article counts per author PID, so each count is a lookup
+            ese_counts = parsing.count_journal_authors(
+                author_response.content, "Empir. Softw. Eng."
+            )
+            for coauthor in coauthors:
+                coauthor["count"] = ese_counts[coauthor["pid"]]
 
         # Sort coauthors by count in descending order
         coauthors.sort(key=lambda x: x["count"], reverse=True)
 
-        # Get the top 5 coauthors
-        top_5_coauthors = coauthors[:5]
-
-        # For each coauthor, fetch their top 5 collaborators
-        for coauthor in top_5_coauthors:
-            coauthor["collaborators"] = get_top_collaborators(coauthor["pid"])
-
-        return top_5_coauthors
+        return coauthors
 
     return None
 
 
-# Function to retrieve top 5 collaborators for a coauthor within ESE
-def get_top_collaborators(coauthor_pid):
-    url = f"https://dblp.uni-trier.de/pid/{coauthor_pid}.xml?view=collaborators"
-
-    response = requests.get(url)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "lxml")
-        collaborators = []
-        author_elements = soup.find_all("author")
-
-        for author_element in author_elements:
-            collaborator_name = preprocess_author_name(author_element.text)
-            collaborator_pid = author_element.get("pid")
-            collaborators.append(
-                {"name": collaborator_name, "pid": collaborator_pid, "count": 0}
-            )
-
-        # Fetch ESE publications for the coauthor
-        coauthor_url = f"https://dblp.uni-trier.de/pid/{coauthor_pid}.xml"
-        coauthor_response = requests.get(coauthor_url)
-        if coauthor_response.status_code == 200:
-            coauthor_soup = BeautifulSoup(coauthor_response.text, "lxml")
-            ese_publications = coauthor_soup.find_all(
-                "journal", text="Empir. Softw. Eng."
-            )
-            for publication in ese_publications:
-                # Find all authors of the publication
-                publication_authors = publication.find_all("author")
-                for collaborator in collaborators:
-                    if any(
-                        collaborator["pid"] in author.get("pid")
-                        for author in publication_authors
-                    ):
-                        collaborator["count"] += 1
-
-        # Sort collaborators by count in descending order
-        collaborators.sort(key=lambda x: x["count"], reverse=True)
-
-        # Get the top 5 collaborators
-        return collaborators[:5]
-
-    return None
+# Function to convert one author's part of the crawl into the sunburst format:
+# author -> top 5 ESE coauthors -> each coauthor's top 5 ESE collaborators
+def convert_to_sunburst_data(crawl_result, seed_names, seed):
+    def make_node(entry, depth):
+        pid = entry["pid"]
+        if depth == 0:
+            top_coauthors = crawl_result.children(pid)
+            return {
+                "name": seed_names[pid],
+                "most_collaborated": top_coauthors[0]["name"] if top_coauthors else "",
+                "url": f"https://dblp.uni-trier.de/pid/{pid}.html",
+            }
+        if depth == 1:
+            return {
+                "name": f"{entry['name']} ({entry['count']})",
+                "url": f"https://dblp.uni-trier.de/pid/{pid}.html",
+                "value": 100,
+            }
+        return {"name": entry["name"], "pid": pid, "count": entry["count"]}
+
+    return crawl_result.tree(seed, make_node, max_depth=2)
 
 
 # Example usage:
@@ -135,46 +83,86 @@ authors = [
     "Cor-Paul Bezemer (20)",
 ]
 
-authors_data = {}
-
-for author in authors:
-    pid = get_pid(author)
-    if pid:
-        top_coauthors = get_top_coauthors(pid)
-        authors_data[author] = {
-            "name": author,
-            "pid": pid,
-            "most_collaborated": top_coauthors[0]["name"] if top_coauthors else "",
-            "top_coauthors": top_coauthors,
-        }
-
-# Convert data to a format suitable for visualization
-sunburst_data = {
-    "name": "ICSE Authors",
-    "children": [],
-}
-
-for author_name, author_info in authors_data.items():
-    author_node = {
-        "name": author_info["name"],
-        "most_collaborated": author_info["most_collaborated"],
-        "url": f"https://dblp.uni-trier.de/pid/{author_info['pid']}.html",
-        "children": [],
-    }
-
-    for coauthor in author_info["top_coauthors"]:
-        coauthor_node = {
-            "name": f"{coauthor['name']} ({coauthor['count']})",
-            "url": f"https://dblp.uni-trier.de/pid/{coauthor['pid']}.html",
-            "value": 100,
-            "children": get_top_collaborators(coauthor["pid"]),
-        }
-        author_node["children"].append(coauthor_node)
-
-    sunburst_data["children"].append(author_node)
-
-# Save the final JSON
-with open("final_ese_coauthors.json", "w") as f:
-    json.dump(sunburst_data, f, indent=2)
-
-print("File saved to final_ese_coauthors.json")
+
+# Function to set up the shared client and return the PID resolver. The rate
+# limit is shared by every script running on this machine, requests are
+# spread over the dblp mirrors, and name -> PID mappings are kept between
+# runs, so known authors resolve at once
+def configure():
+    client.configure(
+        cache=ResponseCache("dblp_cache.sqlite"),
+        rate_limiter=RateLimiter(path="dblp_ratelimit.state"),
+        mirrors=HostPool(),
+    )
+    return PidResolver("dblp_pids.sqlite")
+
+
+# Function to resolve the seed names to PIDs in one batch; unknown names are
+# searched for concurrently and the PIDs come back in list order
+def resolve_seeds(resolver, names):
+    seed_names = {}
+    for author, pid in zip(names, resolver.resolve_all(names)):
+        if pid:
+            seed_names.setdefault(pid, author)
+    return seed_names
+
+
+# Function to wrap expand so that authors whose records haven't changed since
+# the last run are answered from the stored crawl after one conditional
+# request for their XML
+def make_recrawler(namespace, expand):
+    return Recrawler(
+        "dblp_recrawl.sqlite",
+        namespace,
+        expand,
+        url="https://dblp.uni-trier.de/pid/{pid}.xml",
+    )
+
+
+# Function to crawl from the seeds and save the sunburst JSON, one author's
+# subtree at a time as soon as its coauthors are crawled, so an interrupted
+# run keeps the finished authors
+def save_sunburst(
+    file, seed_names, expand, root="ICSE Authors", convert=convert_to_sunburst_data
+):
+    with TreeWriter(file, {"name": root}, indent=2) as writer:
+
+        def save_subtree(crawl_result, pid):
+            writer.write(convert(crawl_result, seed_names, pid))
+
+        # Breadth-first over author -> coauthors -> collaborators, fetching
+        # each PID once even when authors share coauthors
+        crawl(
+            list(seed_names),
+            expand,
+            depth=2,
+            fanout=5,
+            on_seed=save_subtree,
+        )
+
+
+# Function to print how the run went
+def print_stats(resolver, recrawler):
+    stats = client.get_client().stats
+    print(f"Connections opened: {stats.opened}, reused: {stats.reused}")
+    print(f"Cache: {client.get_client().cache.stats}")
+    print(f"PID resolver: {resolver.stats}")
+    print(f"Recrawl: {recrawler.stats}")
+    print(f"Rate limiter: {client.get_client().rate_limiter.stats}")
+    for host in client.get_client().mirrors.stats:
+        print(f"Mirror {host.base}: {host.requests} requests, {host.failures} failures")
+
+
+def main():
+    resolver = configure()
+    seed_names = resolve_seeds(resolver, authors)
+    recrawler = make_recrawler("ese.get_ese_coauthors", get_ese_coauthors)
+
+    save_sunburst("final_ese_coauthors.json", seed_names, recrawler.expand)
+
+    print("File saved to final_ese_coauthors.json")
+    print_stats(resolver, recrawler)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
-import requests
 from bs4 import BeautifulSoup
 
+from dblp import client
+from dblp.cache import ResponseCache
+
+client.configure(cache=ResponseCache("dblp_cache.sqlite"))
+
 
 # Function to retrieve a list of authors who published at a conference
 def get_icse_authors(conference_name):
     print("get_icse_authors")
     dblp_url = f"http://dblp.uni-trier.de/search/publ?q={conference_name}:"
-    response = requests.get(dblp_url)
+    response = client.get(dblp_url)
 
     if response.status_code == 200:
         soup = BeautifulSoup(response.text, "html.parser")
@@ -30,7 +34,7 @@ def get_coauthors(author_data):
     author_name = author_data["author"]
     author_url = author_data["url"]
 
-    response = requests.get(author_url)
+    response = client.get(author_url)
 
     if response.status_code == 200:
         soup = BeautifulSoup(response.text, "html.parser")
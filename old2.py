@@ -1,8 +1,13 @@
-import requests
 from bs4 import BeautifulSoup
-import json
 import unicodedata
 
+from dblp import client
+from dblp.cache import ResponseCache
+from dblp.linkgraph import convert
+from dblp.output import GraphWriter
+
+client.configure(cache=ResponseCache("dblp_cache.sqlite"))
+
 # Function to preprocess author names
 def preprocess_author_name(author_name):
     # Remove special characters and convert to ASCII
@@ -12,7 +17,7 @@ def preprocess_author_name(author_name):
 # Function to retrieve a list of authors who published at a conference
 def get_icse_authors(conference_name):
     dblp_url = f"http://dblp.uni-trier.de/search/publ?q={conference_name}:"
-    response = requests.get(dblp_url)
+    response = client.get(dblp_url)
 
     if response.status_code == 200:
         soup = BeautifulSoup(response.text, "html.parser")
@@ -36,7 +41,7 @@ def get_coauthors(author_data, authors):
     author_name = author_data["author_name"]
     author_url = author_data["url"]
 
-    response = requests.get(author_url)
+    response = client.get(author_url)
 
     if response.status_code == 200:
         soup = BeautifulSoup(response.text, "html.parser")
@@ -61,35 +66,29 @@ def get_coauthors(author_data, authors):
 
 def main():
     authors = get_icse_authors("MSR")
-    nodes = []  # Create an empty list for nodes
-    links = []  # Create an empty list for links
-
-    for author_name, author_data in authors.items():
-        coauthors = get_coauthors(author_data, authors)
-
-        # Add the author as a node
-        nodes.append({"id": author_name})
 
-        # Add links to co-authors
-        for coauthor in coauthors:
-            links.append({"source": author_name, "target": coauthor})
-            authors[coauthor]["coauthors"].add(author_name)
+    # Links are written as they are found; the nodes follow at the end, once
+    # it is known which authors have any co-authorship links
+    with GraphWriter("coauthors_collab_filtered.json") as graph:
+        for author_name, author_data in authors.items():
+            coauthors = get_coauthors(author_data, authors)
 
-    # Filter out co-authors that don't have any co-authorship links
-    nodes = [author for author in nodes if authors[author["id"]]["coauthors"]]
-    links = [link for link in links if link["source"] in authors and link["target"] in authors]
+            # Add links to co-authors
+            for coauthor in coauthors:
+                graph.add_link({"source": author_name, "target": coauthor})
+                authors[coauthor]["coauthors"].add(author_name)
 
-    # Create a JSON object with nodes and links
-    graph_data = {"nodes": nodes, "links": links}
-
-    # Print the JSON object as a string
-    print(json.dumps(graph_data, indent=2))
-
-    with open("coauthors_collab_filtered.json", "w") as f:
-        json.dump(graph_data, f)
+        # Add the authors that have any co-authorship links as nodes
+        for author_name, author_data in authors.items():
+            if author_data["coauthors"]:
+                graph.add_node({"id": author_name})
 
     print("File saved to coauthors_collab_filtered.json")
 
+    # The same graph with each name stored once, for loading quickly
+    convert("coauthors_collab_filtered.json", "coauthors_collab_filtered.npz")
+    print("File saved to coauthors_collab_filtered.npz")
+
 if __name__ == "__main__":
     main()
 
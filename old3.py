@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import unicodedata
@@ -8,6 +7,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
 
+from dblp import client
+from dblp.cache import ResponseCache
+
+client.configure(cache=ResponseCache("dblp_cache.sqlite"))
+
 # Function to preprocess author names
 def preprocess_author_name(author_name):
     author_name = "".join(
@@ -76,7 +80,7 @@ def get_coauthors(author_data, authors):
     author_name = author_data["author_name"]
     author_url = author_data["url"]
 
-    response = requests.get(author_url)
+    response = client.get(author_url)
 
     if response.status_code == 200:
         soup = BeautifulSoup(response.text, "html.parser")
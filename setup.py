@@ -19,5 +19,9 @@ setup(name='dblp-python',
       packages=['dblp'],
       install_requires=[
                       'requests>=1.0.4',
-                  ]
+                      'lxml',
+                  ],
+      extras_require={
+                      'graph': ['numpy'],
+                  }
      )
@@ -0,0 +1,227 @@
+"""
+Tests for dblp.client against a local http.server standing in for dblp.
+"""
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from dblp.cache import ResponseCache
+from dblp.client import Client
+from dblp.mirrors import HostPool
+from dblp.ratelimit import RateLimiter
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Answers every GET from the server's ``replies``, a list of (status,
+    headers, body) tuples used up in order, the last one repeating. The
+    request headers are appended to the server's ``seen``.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.seen.append((self.path, dict(self.headers)))
+            reply = server.replies[min(len(server.seen),
+                                       len(server.replies)) - 1]
+        status, headers, body = reply(self) if callable(reply) else reply
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class Server(object):
+    """
+    A local HTTP server on a free port, run in a thread while in a with
+    block.
+    """
+    def __init__(self, *replies):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        # the client keeps connections alive; don't wait on them at shutdown
+        self.httpd.daemon_threads = True
+        self.httpd.replies = list(replies)
+        self.httpd.seen = []
+        self.httpd.lock = threading.Lock()
+        self.url = 'http://127.0.0.1:{}'.format(self.httpd.server_port)
+
+    @property
+    def seen(self):
+        return self.httpd.seen
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+def test_revalidates_stale_entries():
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResponseCache(os.path.join(directory, 'cache.sqlite'), ttl=0)
+        client = Client(cache=cache, retries=0)
+        etag = {'ETag': '"v1"'}
+        with Server((200, etag, b'<dblpperson/>'),
+                    (304, etag, b'')) as server:
+            first = client.get(server.url + '/pid/x.xml')
+            second = client.get(server.url + '/pid/x.xml')
+        assert first.content == second.content == b'<dblpperson/>'
+        assert second.status_code == 200
+        assert 'If-None-Match' not in server.seen[0][1]
+        assert server.seen[1][1]['If-None-Match'] == '"v1"'
+        assert cache.stats.revalidated == 1
+        client.close()
+    finally:
+        shutil.rmtree(directory)
+
+def test_serves_fresh_entries_without_requests():
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResponseCache(os.path.join(directory, 'cache.sqlite'))
+        client = Client(cache=cache, retries=0)
+        with Server((200, {}, b'<dblpperson/>')) as server:
+            client.get(server.url + '/pid/x.xml')
+            response = client.get(server.url + '/pid/x.xml')
+        assert response.content == b'<dblpperson/>'
+        assert len(server.seen) == 1
+        assert cache.stats.hits == 1
+        client.close()
+    finally:
+        shutil.rmtree(directory)
+
+class FakeClock(object):
+    """
+    A clock that only moves when slept on, for RateLimiter tests.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def test_retries_throttled_requests():
+    client = Client(retries=2)
+    with Server((429, {'Retry-After': '0'}, b''),
+                (200, {}, b'<authors/>')) as server:
+        response = client.get(server.url + '/search/author')
+    assert response.status_code == 200
+    assert response.content == b'<authors/>'
+    assert len(server.seen) == 2
+    client.close()
+
+def test_gives_up_after_retries():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+    client = Client(retries=2, rate_limiter=limiter)
+    with Server((503, {'Retry-After': '3'}, b'')) as server:
+        response = client.get(server.url + '/search/author')
+    assert response.status_code == 503
+    assert len(server.seen) == 3
+    # each throttle pauses every user of the limiter and halves its rate
+    assert limiter.stats.throttled == 2
+    assert limiter.rate == 2.5
+    assert len(clock.slept) == 2 and all(s >= 3 for s in clock.slept)
+    client.close()
+
+def closed_port_url():
+    """
+    Returns the URL of a local port nothing listens on.
+    """
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return 'http://127.0.0.1:{}'.format(port)
+
+def test_fails_over_to_another_mirror():
+    with Server((500, {}, b'')) as down, \
+            Server((200, {}, b'<dblpperson/>')) as up:
+        pool = HostPool([down.url, up.url])
+        client = Client(retries=0, mirrors=pool)
+        # the unmeasured hosts tie, so ask until the failing one was picked
+        for _ in range(20):
+            response = client.get(down.url + '/pid/x.xml')
+            assert response.status_code == 200
+            assert response.content == b'<dblpperson/>'
+            if down.seen:
+                break
+        stats = dict((s.base, s) for s in pool.stats)
+    assert len(down.seen) == 1
+    assert stats[down.url].failures == 1
+    assert stats[down.url].down_for > 0
+    assert stats[up.url].failures == 0
+    client.close()
+
+def test_fails_over_on_connection_errors():
+    dead = closed_port_url()
+    with Server((200, {}, b'<dblpperson/>')) as up:
+        pool = HostPool([dead, up.url])
+        client = Client(retries=0, mirrors=pool, timeout=5)
+        for _ in range(20):
+            response = client.get(dead + '/pid/x.xml')
+            assert response.content == b'<dblpperson/>'
+            if pool.stats[0].failures:
+                break
+    assert pool.stats[0].failures == 1
+    assert pool.stats[1].failures == 0
+    client.close()
+
+def test_returns_the_last_failure_when_every_mirror_fails():
+    with Server((502, {}, b'a')) as first, Server((502, {}, b'b')) as second:
+        pool = HostPool([first.url, second.url])
+        client = Client(retries=0, mirrors=pool)
+        response = client.get(first.url + '/pid/x.xml')
+    assert response.status_code == 502
+    assert len(first.seen) == len(second.seen) == 1
+    client.close()
+
+def test_throttling_is_retried_on_the_same_mirror():
+    with Server((503, {'Retry-After': '0'}, b''),
+                (200, {}, b'<dblpperson/>')) as server:
+        pool = HostPool([server.url])
+        client = Client(retries=1, mirrors=pool)
+        response = client.get(server.url + '/pid/x.xml')
+    assert response.content == b'<dblpperson/>'
+    assert len(server.seen) == 2
+    assert pool.stats[0].failures == 0
+    assert pool.stats[0].in_flight == 0
+    client.close()
+
+def test_releases_the_mirror_on_other_errors():
+    with Server((302, {'Location': '/loop'}, b'')) as server:
+        pool = HostPool([server.url])
+        client = Client(retries=0, mirrors=pool)
+        try:
+            client.get(server.url + '/pid/x.xml')
+        except requests.TooManyRedirects:
+            pass
+        else:
+            assert False, 'expected TooManyRedirects'
+    assert pool.stats[0].in_flight == 0
+    assert pool.stats[0].failures == 0
+    client.close()
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print('Tests passed')
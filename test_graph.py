@@ -0,0 +1,91 @@
+"""
+Tests for dblp.graph, ranking against counts taken straight from the
+records.
+"""
+import shutil
+import tempfile
+from collections import Counter
+
+from dblp.graph import CoauthorGraph
+from dblp.index import build_index
+from test_store import make_records, make_store
+
+def brute_force(records, store, names, venue=None, years=None, k=5):
+    """
+    Returns the top ``k`` (coauthor id, weight) pairs of the person with
+    ``names``, counted record by record.
+    """
+    counts = Counter()
+    for key, type, mdate, title, year, record_venue, authors in records:
+        if venue is not None and record_venue != venue:
+            continue
+        if years is not None and not (year and years[0] <= year <= years[1]):
+            continue
+        if set(names) & set(authors):
+            counts.update(store.author_id(a) for a in set(authors) - set(names))
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+def test_top_coauthors_match_brute_force():
+    directory = tempfile.mkdtemp()
+    try:
+        records = make_records()
+        store = make_store(directory, records)
+        graph = CoauthorGraph.build(store)
+        for author in range(len(store.names)):
+            names = [store.names[author]]
+            for facets in [{}, {'venue': 'ICSE'}, {'years': (2016, 2021)},
+                           {'venue': 'MSR', 'years': (2015, 2018)}]:
+                assert graph.top_coauthors(author, k=3, **facets) == \
+                    brute_force(records, store, names, k=3, **facets)
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+def test_top_coauthors_many_matches_brute_force():
+    directory = tempfile.mkdtemp()
+    try:
+        records = make_records()
+        store = make_store(directory, records)
+        index = build_index(store)
+        graph = CoauthorGraph.build(store)
+        authors = list(range(0, len(store.names), 4)) + ['p/same']
+        for facets in [{}, {'venue': 'Empir. Softw. Eng.', 'years': (2018,
+                                                                   2021)}]:
+            results = graph.top_coauthors_many(authors, index=index, **facets)
+            for author, result in zip(authors, results):
+                if author == 'p/same':
+                    names = ['Author 0', 'Author 1']
+                else:
+                    names = [store.names[author]]
+                assert result == brute_force(records, store, names, **facets)
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+def test_chunked_builds_rank_like_one_build():
+    directory = tempfile.mkdtemp()
+    try:
+        records = make_records()
+        store = make_store(directory, records)
+        whole = CoauthorGraph.build(store)
+        chunked = CoauthorGraph(store=store)
+        for stop in range(0, len(store), 70):
+            chunked.update(store, stop)
+        chunked.update(store)
+        assert chunked.edge_indptr.tolist() == whole.edge_indptr.tolist()
+        assert chunked.edge_neighbors.tolist() == \
+            whole.edge_neighbors.tolist()
+        assert chunked.edge_weights.tolist() == whole.edge_weights.tolist()
+        for author in range(len(store.names)):
+            assert chunked.top_coauthors(author, venue='ICSE',
+                                         years=(2016, 2021)) == \
+                whole.top_coauthors(author, venue='ICSE', years=(2016, 2021))
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print('Tests passed')
@@ -0,0 +1,78 @@
+"""
+Tests that dblp.output writes exactly what json.dumps would.
+"""
+import io
+import json
+
+from dblp import output
+from dblp.output import GraphWriter, TreeWriter, write_tree
+
+SUBTREES = [
+    {'name': 'Ahmed E. Hassan', 'children': [
+        {'name': 'Bram Adams', 'value': 12, 'children': []},
+        {'name': 'Zoë Äbel', 'value': 3}]},
+    {'name': 'David Lo', 'children': []},
+]
+
+NODES = [{'id': 'Ahmed E. Hassan', 'group': 1}, {'id': 'Zoë Äbel'}]
+
+LINKS = [{'source': 'Ahmed E. Hassan', 'target': 'Zoë Äbel', 'value': 2},
+         {'source': 'Zoë Äbel', 'target': 'Ahmed E. Hassan', 'value': 2}]
+
+def test_tree_writer_matches_json_dumps():
+    for indent in (None, 0, 2, 4):
+        for subtrees in (SUBTREES, []):
+            tree = {'name': 'ESE Authors', 'children': subtrees}
+            out = io.StringIO()
+            with TreeWriter(out, {'name': 'ESE Authors'},
+                            indent=indent) as writer:
+                for subtree in subtrees:
+                    writer.write(subtree)
+            assert out.getvalue() == json.dumps(tree, indent=indent)
+
+            out = io.StringIO()
+            assert write_tree(out, dict(tree, children=iter(subtrees)),
+                              indent=indent) == len(subtrees)
+            assert out.getvalue() == json.dumps(tree, indent=indent)
+
+def test_tree_writer_lines():
+    out = io.StringIO()
+    write_tree(out, {'name': 'ESE Authors', 'children': SUBTREES},
+               lines=True)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == \
+        SUBTREES
+
+def test_graph_writer_matches_json_dumps():
+    for indent in (None, 0, 2):
+        for nodes, links in ((NODES, LINKS), (NODES, []), ([], [])):
+            out = io.StringIO()
+            with GraphWriter(out, indent=indent) as writer:
+                # links may come before the nodes they join
+                for link in links:
+                    writer.add_link(link)
+                for node in nodes:
+                    writer.add_node(node)
+            assert out.getvalue() == json.dumps(
+                {'nodes': nodes, 'links': links}, indent=indent)
+
+def test_graph_writer_spills_links_to_disk():
+    links = [{'source': str(i), 'target': str(i + 1)} for i in range(100)]
+    out = io.StringIO()
+    spool_size, output.SPOOL_SIZE = output.SPOOL_SIZE, 64
+    try:
+        with GraphWriter(out, indent=2) as writer:
+            for link in links:
+                writer.add_link(link)
+            assert writer._spool._rolled
+            for node in NODES:
+                writer.add_node(node)
+    finally:
+        output.SPOOL_SIZE = spool_size
+    assert out.getvalue() == json.dumps({'nodes': NODES, 'links': links},
+                                        indent=2)
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print('Tests passed')
@@ -0,0 +1,109 @@
+"""
+Tests for dblp.recrawl against a local http.server standing in for dblp.
+"""
+import os
+import shutil
+import tempfile
+
+from dblp import client
+from dblp.cache import ResponseCache
+from dblp.recrawl import Recrawler
+from test_client import Server
+
+PERSON_XML = (b'<dblpperson name="A" pid="a/1"><r>'
+              b'<article key="journals/x/A1" mdate="2024-01-01">'
+              b'<author pid="a/1">A</author></article></r></dblpperson>')
+
+def by_total(pid):
+    return [{'pid': 'b/1', 'count': 9}]
+
+def by_venue(pid):
+    return [{'pid': 'b/1', 'count': 2}]
+
+def test_namespaces_share_a_store():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'recrawl.sqlite')
+    client.configure(retries=0)
+    try:
+        with Server((200, {'ETag': '"v1"'}, PERSON_XML)) as server:
+            url = server.url + '/pid/{pid}.xml'
+            totals = Recrawler(path, 'totals', by_total, url=url)
+            assert totals.expand('a/1') == by_total('a/1')
+
+            # the other expand function's entries aren't returned...
+            venues = Recrawler(path, 'venues', by_venue, url=url)
+            assert venues.expand('a/1') == by_venue('a/1')
+            assert venues.stats.changed == 1 and venues.stats.unchanged == 0
+
+            # ...but each namespace's own are, on the next run
+            totals = Recrawler(path, 'totals', by_total, url=url)
+            venues = Recrawler(path, 'venues', by_venue, url=url)
+            assert totals.expand('a/1') == by_total('a/1')
+            assert venues.expand('a/1') == by_venue('a/1')
+            assert totals.stats.unchanged == venues.stats.unchanged == 1
+
+            # forgetting is per namespace too
+            venues.forget()
+            assert Recrawler(path, 'totals', by_total, url=url) \
+                .expand('a/1') == by_total('a/1')
+            venues = Recrawler(path, 'venues', by_venue, url=url)
+            venues.expand('a/1')
+            assert venues.stats.changed == 1
+    finally:
+        client.configure()
+        shutil.rmtree(directory)
+
+class Counting(object):
+    """
+    An expand function that counts its calls.
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, pid):
+        self.calls += 1
+        return by_total(pid)
+
+def test_keeps_new_validators_of_unchanged_records():
+    client.configure(retries=0)
+    try:
+        with Server((200, {'ETag': '"v1"'}, PERSON_XML),
+                    (200, {'ETag': '"v2"'}, PERSON_XML),
+                    (304, {'ETag': '"v2"'}, b'')) as server:
+            expand = Counting()
+            recrawler = Recrawler(None, 'totals', expand,
+                                  url=server.url + '/pid/{pid}.xml')
+            for _ in range(3):
+                assert recrawler.expand('a/1') == by_total('a/1')
+        assert expand.calls == 1
+        assert server.seen[1][1]['If-None-Match'] == '"v1"'
+        assert server.seen[2][1]['If-None-Match'] == '"v2"'
+        assert recrawler.stats.unchanged == 2
+    finally:
+        client.configure()
+
+def test_fresh_cache_entries_are_revalidated():
+    directory = tempfile.mkdtemp()
+    changed = PERSON_XML.replace(b'2024-01-01', b'2024-02-01')
+    try:
+        client.configure(retries=0, cache=ResponseCache(
+            os.path.join(directory, 'cache.sqlite')))
+        with Server((200, {'ETag': '"v1"'}, PERSON_XML),
+                    (200, {'ETag': '"v2"'}, changed)) as server:
+            expand = Counting()
+            recrawler = Recrawler(None, 'totals', expand,
+                                  url=server.url + '/pid/{pid}.xml')
+            recrawler.expand('a/1')
+            recrawler.expand('a/1')
+        assert len(server.seen) == 2
+        assert expand.calls == 2
+        assert recrawler.changes['a/1'].modified == ['journals/x/A1']
+    finally:
+        client.configure()
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print('Tests passed')
@@ -0,0 +1,112 @@
+"""
+Tests for dblp.store and dblp.index on a small generated store.
+"""
+import random
+import shutil
+import tempfile
+
+from dblp.index import build_index
+from dblp.store import RecordStore, StoreBuilder
+
+VENUES = ['Empir. Softw. Eng.', 'ICSE', 'MSR']
+
+def make_records(count=300, names=40, seed=1):
+    """
+    Returns ``count`` random (key, type, mdate, title, year, venue, authors)
+    records over ``names`` authors, some with accented names. Author 0 and
+    Author 1 are one person's names, so they never write together.
+    """
+    rng = random.Random(seed)
+    people = ['Author {}'.format(i) for i in range(names - 2)] + \
+        ['Zoë Äbel', 'Ahmed E. Hassan']
+    records = []
+    for i in range(count):
+        authors = rng.sample(people, rng.randint(1, 5))
+        if 'Author 0' in authors and 'Author 1' in authors:
+            authors.remove('Author 1')
+        records.append(('journals/x/R{}'.format(i),
+                        rng.choice(['article', 'inproceedings']),
+                        '2020-01-{:02d}'.format(rng.randint(1, 28)),
+                        'Title {}'.format(i),
+                        rng.choice([None, 2015, 2018, 2021]),
+                        rng.choice(VENUES + [None]), authors))
+    return records
+
+def make_store(directory, records):
+    """
+    Builds a store of ``records`` in ``directory``, giving every third
+    author a pid and Author 0 and Author 1 the same one.
+    """
+    builder = StoreBuilder(directory)
+    for record in records:
+        builder.add(*record)
+    names = sorted(set(n for record in records for n in record[6]))
+    for i, name in enumerate(names):
+        if i % 3 == 0:
+            builder.add_person('p/{}'.format(i), [name])
+    builder.add_person('p/same', ['Author 0', 'Author 1'])
+    builder.close()
+    return RecordStore(directory)
+
+def test_store_round_trip():
+    directory = tempfile.mkdtemp()
+    try:
+        records = make_records()
+        store = make_store(directory, records)
+        assert len(store) == len(records)
+        for row, (key, type, mdate, title, year, venue, authors) in \
+                enumerate(records):
+            publication = store.publication(row)
+            assert store.row(key) == row
+            assert publication.type == type
+            assert publication.mdate == mdate
+            assert publication.title == title
+            assert publication.year == year
+            assert store.venue(row) == venue
+            assert publication.authors == authors
+        assert store.row('journals/x/missing') is None
+        assert store.author_id('Nobody') is None
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+def test_index_matches_a_scan():
+    directory = tempfile.mkdtemp()
+    try:
+        records = make_records()
+        store = make_store(directory, records)
+        index = build_index(store)
+        rows_of = {}
+        for row, record in enumerate(records):
+            for name in record[6]:
+                rows_of.setdefault(name, []).append(row)
+        for name, rows in rows_of.items():
+            assert index.rows(store.author_id(name)) == rows
+
+        ids = index.author_ids('p/same')
+        assert sorted(ids) == sorted([store.author_id('Author 0'),
+                                      store.author_id('Author 1')])
+        assert index.rows_for_pid('p/same') == sorted(
+            set(rows_of['Author 0']) | set(rows_of['Author 1']))
+        assert index.author_ids('p/missing') == []
+
+        # the two authors sharing the most records
+        names = max(((a, b) for a in rows_of for b in rows_of if a < b),
+                    key=lambda p: len(set(rows_of[p[0]]) & set(rows_of[p[1]])))
+        pair = [store.author_id(name) for name in names]
+        shared = sorted(set(rows_of[names[0]]) & set(rows_of[names[1]]))
+        assert index.coauthored(pair) == shared
+        expected = [row for row in shared if records[row][5] == 'ICSE'
+                    and records[row][4] and 2016 <= records[row][4] <= 2021]
+        assert expected
+        assert index.coauthored(pair, venue='ICSE',
+                                years=(2016, 2021)) == expected
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+    print('Tests passed')